@@ -34,7 +34,7 @@ def _inactive() -> HTTPException:
     )
 
 
-async def _get_user_from_token(token: str, service: AuthService) -> User:
+def _get_user_id_from_token(token: str) -> int:
     try:
         # Decode the JWT token
         payload = decode_access_token(token)
@@ -45,13 +45,50 @@ async def _get_user_from_token(token: str, service: AuthService) -> User:
 
         # Convert string ID back to int
         try:
-            user_id = int(user_id_str)
+            return int(user_id_str)
         except (ValueError, TypeError):
             raise _unauthorized() from None
 
     except jwt.InvalidTokenError as err:
         raise _unauthorized() from err
 
+
+async def _get_active_user_id_from_token(token: str, service: AuthService) -> int:
+    user_id = _get_user_id_from_token(token)
+
+    # Only the active flag is needed, so skip loading the full user row
+    is_active = await service.get_user_active_status(user_id)
+    if is_active is None:
+        raise _unauthorized()
+    if not is_active:
+        raise _inactive()
+
+    return user_id
+
+
+def _get_token_from_request(request: Request) -> str:
+    token: str | None = None
+
+    auth_header = request.headers.get("Authorization")
+    if auth_header:
+        scheme, _, param = auth_header.partition(" ")
+        if scheme.lower() == "bearer" and param:
+            token = param
+        else:
+            token = None
+
+    if not token:
+        token = request.cookies.get(TOKEN_COOKIE_KEY)
+
+    if not token:
+        raise _unauthorized()
+
+    return token
+
+
+async def _get_user_from_token(token: str, service: AuthService) -> User:
+    user_id = _get_user_id_from_token(token)
+
     # Get the user from the database
     try:
         user = await service.get_user_by_id(user_id)
@@ -96,22 +133,7 @@ async def get_current_user_from_request(
     service: AuthService = Depends(get_auth_service),
 ) -> User:
     """Get current user from Authorization header or auth cookie."""
-    token: str | None = None
-
-    auth_header = request.headers.get("Authorization")
-    if auth_header:
-        scheme, _, param = auth_header.partition(" ")
-        if scheme.lower() == "bearer" and param:
-            token = param
-        else:
-            token = None
-
-    if not token:
-        token = request.cookies.get(TOKEN_COOKIE_KEY)
-
-    if not token:
-        raise _unauthorized()
-
+    token = _get_token_from_request(request)
     return await _get_user_from_token(token, service)
 
 
@@ -130,3 +152,27 @@ def require_user_id(user: User) -> int:
             headers={"WWW-Authenticate": "Bearer"},
         )
     return user.id
+
+
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    service: AuthService = Depends(get_auth_service),
+) -> int:
+    """Get the ID of the current authenticated active user from the JWT token.
+
+    Checks only the user's active flag instead of loading the full user.
+    """
+    return await _get_active_user_id_from_token(credentials.credentials, service)
+
+
+async def get_current_user_id_from_request(
+    request: Request,
+    service: AuthService = Depends(get_auth_service),
+) -> int:
+    """Get the current active user's ID from Authorization header or auth cookie."""
+    token = _get_token_from_request(request)
+    return await _get_active_user_id_from_token(token, service)
+
+
+CurrentUserId = Annotated[int, Depends(get_current_user_id)]
+CurrentUserIdFromRequest = Annotated[int, Depends(get_current_user_id_from_request)]
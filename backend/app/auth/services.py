@@ -105,6 +105,19 @@ class AuthService:
             raise NotFoundError(f"User with ID {user_id} not found")
         return user
 
+    async def get_user_active_status(self, user_id: int) -> bool | None:
+        """
+        Get only a user's active flag, without loading the full user row.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Whether the user is active, or None if the user doesn't exist
+        """
+        stmt = select(User.is_active).where(User.id == user_id)
+        return await self.session.scalar(stmt)
+
     async def update_user(self, user_id: int, user_in: UserUpdate) -> User:
         """
         Update a user.
@@ -1,6 +1,7 @@
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 from datetime import UTC, datetime
 
+from sqlalchemy.dialects.postgresql import insert
 from sqlmodel import col, func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -56,6 +57,86 @@ class CategoryService:
         result: Category | None = await self.session.scalar(stmt)
         return result
 
+    async def get_by_names(
+        self, names: Iterable[str], user_id: int
+    ) -> dict[str, Category]:
+        """Get categories by name for a specific user in a single query.
+
+        Args:
+            names: The category names to search for.
+            user_id: The ID of the user whose categories to search.
+
+        Returns:
+            A mapping of category name to category for the names that exist.
+        """
+        unique_names = set(names)
+        if not unique_names:
+            return {}
+        stmt = select(Category).where(
+            col(Category.name).in_(unique_names), col(Category.user_id) == user_id
+        )
+        result = await self.session.exec(stmt)
+        return {category.name: category for category in result.all()}
+
+    async def get_or_create_by_names(
+        self, categories_in: Iterable[CategoryCreate], user_id: int
+    ) -> dict[str, Category]:
+        """Get categories by name for a user, creating the missing ones.
+
+        Missing categories are written with a single ``INSERT ... ON CONFLICT DO
+        NOTHING``, so a concurrent request creating the same name cannot fail
+        the call; any rows it skipped are read back afterwards.
+
+        Args:
+            categories_in: The categories to resolve; the first entry wins for
+                repeated names.
+            user_id: The ID of the user who owns the categories.
+
+        Returns:
+            A mapping of category name to category for every requested name.
+        """
+        requested: dict[str, CategoryCreate] = {}
+        for category_in in categories_in:
+            requested.setdefault(category_in.name, category_in)
+
+        categories = await self.get_by_names(requested, user_id)
+        missing = [
+            category_in
+            for name, category_in in requested.items()
+            if name not in categories
+        ]
+        if not missing:
+            return categories
+
+        now = datetime.now(UTC)
+        stmt = (
+            insert(Category)
+            .values(
+                [
+                    {
+                        **category_in.model_dump(),
+                        "user_id": user_id,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for category_in in missing
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["name", "user_id"])
+            .returning(Category)
+        )
+        result = await self.session.scalars(stmt)
+        categories.update({category.name: category for category in result.all()})
+
+        if len(categories) < len(requested):
+            # Rows created concurrently by another request were skipped above
+            categories.update(
+                await self.get_by_names(
+                    (name for name in requested if name not in categories), user_id
+                )
+            )
+        return categories
+
     async def list(
         self,
         *,
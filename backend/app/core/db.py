@@ -17,6 +17,10 @@ engine = create_async_engine(
     settings.database_url,
     echo=settings.DB_ECHO_LOG,
     future=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    # Drop connections the server closed while idle instead of failing a request
+    pool_pre_ping=True,
 )
 
 # Create session factory
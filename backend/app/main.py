@@ -1,4 +1,5 @@
 import logging
+import mimetypes
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
@@ -30,6 +31,8 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
             f"Starting {settings.PROJECT_NAME} v{settings.VERSION} by {__author__}"
         )
         await init_db()
+        # Load the mimetypes tables up front instead of on the first image request
+        mimetypes.init()
         yield
     except SQLAlchemyError as e:
         logger.error(f"Database initialization failed: {e}")
@@ -1,10 +1,15 @@
 """Export utilities for receipts (PDF, CSV formatters)."""
 
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from copy import copy
 from datetime import datetime
 from decimal import Decimal
-from io import BytesIO
+from functools import lru_cache
 from pathlib import Path
+from queue import Empty, Full, LifoQueue
+from xml.sax.saxutils import escape
 
 from PIL import Image as PILImage
 from reportlab.lib import colors
@@ -34,13 +39,98 @@ _BORDER = colors.HexColor("#e5e5e5")  # --border: oklch(0.922 0 0)
 _SECONDARY_BG = colors.HexColor("#f5f5f5")  # --secondary: oklch(0.97 0 0)
 _ROW_ALT = colors.HexColor("#fafafa")  # alternating row background
 
+# Threads used to read receipt image headers ahead of PDF layout
+_IMAGE_PREFETCH_WORKERS = 8
+
+# Static label parsed once; flowables carry wrap state, so callers use a copy
+_RECEIPT_IMAGE_LABEL = Paragraph(
+    "<font size='8' color='#737373'>Receipt Image</font>",
+    getSampleStyleSheet()["Normal"],
+)
+
+
+def _plain(text: str) -> str:
+    """Escape user text for Paragraph markup, skipping the work for plain strings."""
+    if "<" in text or ">" in text or "&" in text:
+        return escape(text)
+    return text
+
+
+@lru_cache(maxsize=1024)
+def _image_size(path: str, mtime_ns: int) -> tuple[int, int]:
+    """Read image dimensions, cached per file version (mtime keys invalidation)."""
+    del mtime_ns  # only part of the cache key
+    pil_image = PILImage.open(path)
+    try:
+        return pil_image.width, pil_image.height
+    finally:
+        pil_image.close()
+
+
+def _warm_image_size(image_path: str) -> None:
+    """Populate the image size cache for one file, ignoring unreadable images."""
+    path = Path(image_path)
+    # Failures are left for _create_image_section, which skips the image
+    with suppress(Exception):
+        # Same key normalization as _create_image_section, so layout hits
+        _image_size(str(path), path.stat().st_mtime_ns)
+
+
+def _prefetch_image_sizes(receipts: list[Receipt]) -> None:
+    """Read all receipt image headers concurrently before layout.
+
+    Header reads are I/O-bound and release the GIL, so overlapping them keeps
+    image-heavy exports from waiting on one file at a time while the story is
+    built; layout then hits the warm size cache.
+    """
+    image_paths = {
+        str(Path(receipt.image_path)) for receipt in receipts if receipt.image_path
+    }
+    if len(image_paths) < 2:
+        return
+    workers = min(_IMAGE_PREFETCH_WORKERS, len(image_paths))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in pool.map(_warm_image_size, image_paths):
+            pass
+
+
+class _ChunkSink:
+    """Minimal write-only file object that collects PDF output without copying.
+
+    ReportLab renders the whole document in memory and hands it to ``write``
+    in one go (it never seeks), so keeping the chunks and joining them at the
+    end avoids BytesIO's internal buffer growth and the ``getvalue`` copy.
+    """
+
+    def __init__(self) -> None:
+        self.parts: list[bytes] = []
+        self._size = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self.parts.append(data)
+        self._size += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._size
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.parts = []
+        self.closed = True
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.parts)
+
 
 class ReceiptPDFGenerator:
     """Generator for creating professional PDF reports from receipt data."""
 
     def __init__(self) -> None:
         """Initialize the PDF generator."""
-        self.buffer = BytesIO()
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
 
@@ -103,9 +193,15 @@ class ReceiptPDFGenerator:
         )
 
     def generate(self, receipts: list[Receipt], include_images: bool = False) -> bytes:
-        """Generate a PDF report from a list of receipts."""
+        """Generate a PDF report from a list of receipts.
+
+        Each call renders into its own sink, so a pooled generator holds no
+        per-export state and a render still running in an abandoned worker
+        thread cannot clobber the next export's output.
+        """
+        buffer = _ChunkSink()
         doc = SimpleDocTemplate(
-            self.buffer,
+            buffer,
             pagesize=letter,
             rightMargin=0.6 * inch,
             leftMargin=0.6 * inch,
@@ -126,16 +222,20 @@ class ReceiptPDFGenerator:
         # Summary section (side-by-side layout)
         story.extend(self._create_summary_section(receipts))
 
+        if include_images:
+            _prefetch_image_sizes(receipts)
+
         # Each receipt
         for receipt in receipts:
             story.extend(
                 self._create_receipt_section(receipt, include_images=include_images)
             )
 
-        doc.build(story)
-        pdf_bytes = self.buffer.getvalue()
-        self.buffer.close()
-        return pdf_bytes
+        try:
+            doc.build(story)
+            return buffer.getvalue()
+        finally:
+            buffer.close()
 
     def _create_summary_section(self, receipts: list[Receipt]) -> list:
         """Create compact summary with stats and category breakdown side-by-side."""
@@ -160,7 +260,7 @@ class ReceiptPDFGenerator:
         left_content.append([self._stat_cell("Total Receipts", str(total_receipts))])
         for currency, amount in sorted(total_by_currency.items()):
             left_content.append(
-                [self._stat_cell(f"Total ({currency})", f"{amount:.2f}")]
+                [self._stat_cell(f"Total ({_plain(currency)})", f"{amount:.2f}")]
             )
 
         left_table = Table(left_content, colWidths=[2.8 * inch])
@@ -228,28 +328,27 @@ class ReceiptPDFGenerator:
                     ]
                 )
             )
-        else:
-            # No categories - empty placeholder
-            right_table = Table([[""]], colWidths=[4 * inch])
-
-        # Combine into two-column layout
-        main_table = Table(
-            [[left_table, right_table]],
-            colWidths=[3 * inch, 4 * inch],
-        )
-        main_table.setStyle(
-            TableStyle(
-                [
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 0),
-                    ("RIGHTPADDING", (0, 0), (-1, -1), 0),
-                ]
+            # Combine into two-column layout
+            body = Table(
+                [[left_table, right_table]],
+                colWidths=[3 * inch, 4 * inch],
             )
-        )
+            body.setStyle(
+                TableStyle(
+                    [
+                        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                        ("LEFTPADDING", (0, 0), (-1, -1), 0),
+                        ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+                    ]
+                )
+            )
+        else:
+            # No categories - the stats column is the whole body
+            body = left_table
 
         # Wrap in a box (7.3" = full content width)
         box_table = Table(
-            [[main_table]],
+            [[body]],
             colWidths=[7.3 * inch],
         )
         box_table.setStyle(
@@ -304,14 +403,14 @@ class ReceiptPDFGenerator:
         elements: list = []
 
         # Receipt header with inline details
-        header_text = f"{receipt.store_name}"
+        header_text = _plain(receipt.store_name)
         elements.append(Paragraph(header_text, self.styles["ReceiptHeader"]))
 
         # Compact details line
         date_str = receipt.purchase_date.strftime("%b %d, %Y")
         details_parts = [
             f"<b>{date_str}</b>",
-            f"<b>{receipt.currency} {receipt.total_amount:.2f}</b>",
+            f"<b>{_plain(receipt.currency)} {receipt.total_amount:.2f}</b>",
         ]
         if receipt.payment_method:
             method = receipt.payment_method.value.replace("_", " ").title()
@@ -327,18 +426,19 @@ class ReceiptPDFGenerator:
         elements.append(Spacer(1, 6))
 
         # Items table - compact with repeating header
-        items_data: list[list[str]] = [["Item", "Category", "Qty", "Price", "Total"]]
-        for item in receipt.items:
-            cat_name = item.category.name if item.category else "—"
-            items_data.append(
+        items_data: list[list[str]] = [
+            ["Item", "Category", "Qty", "Price", "Total"],
+            *(
                 [
                     item.name,
-                    cat_name,
+                    category.name if (category := item.category) else "—",
                     str(item.quantity),
                     f"{item.unit_price:.2f}",
                     f"{item.total_price:.2f}",
                 ]
-            )
+                for item in receipt.items
+            ),
+        ]
 
         # Full width table (7.3" = page width minus margins)
         # Distribute: Item 3.4", Category 1.6", Qty 0.5", Price 0.9", Total 0.9"
@@ -410,23 +510,18 @@ class ReceiptPDFGenerator:
             return elements
 
         try:
-            pil_image = PILImage.open(path)
+            width, height = _image_size(str(path), path.stat().st_mtime_ns)
 
             # Scale to fit - max 5 inches wide, 6 inches tall
             max_w, max_h = 5 * inch, 6 * inch
-            w_ratio = max_w / pil_image.width
-            h_ratio = max_h / pil_image.height
+            w_ratio = max_w / width
+            h_ratio = max_h / height
             scale = min(w_ratio, h_ratio, 1.0)  # Don't upscale
 
-            new_w = pil_image.width * scale
-            new_h = pil_image.height * scale
+            new_w = width * scale
+            new_h = height * scale
 
-            elements.append(
-                Paragraph(
-                    "<font size='8' color='#737373'>Receipt Image</font>",
-                    self.styles["Normal"],
-                )
-            )
+            elements.append(copy(_RECEIPT_IMAGE_LABEL))
             elements.append(Spacer(1, 4))
 
             img = RLImage(str(path), width=new_w, height=new_h)
@@ -437,3 +532,31 @@ class ReceiptPDFGenerator:
             return []
 
         return elements
+
+
+class _GeneratorPool:
+    """Small per-process pool of PDF generators.
+
+    Building the stylesheet is the expensive part of a generator, so export
+    requests borrow an already-configured instance instead of creating one.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._queue: LifoQueue[ReceiptPDFGenerator] = LifoQueue(maxsize=size)
+
+    def acquire(self) -> ReceiptPDFGenerator:
+        """Borrow a generator, creating one if the pool is empty."""
+        try:
+            return self._queue.get_nowait()
+        except Empty:
+            return ReceiptPDFGenerator()
+
+    def release(self, generator: ReceiptPDFGenerator) -> None:
+        """Return a generator to the pool (dropped if full)."""
+        try:
+            self._queue.put_nowait(generator)
+        except Full:
+            pass
+
+
+pdf_generator_pool = _GeneratorPool(size=4)
@@ -1,10 +1,10 @@
 from datetime import UTC, datetime
 from decimal import Decimal
 from enum import Enum
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 
 from pydantic import computed_field
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.types import String
 from sqlmodel import Field, Relationship, SQLModel
@@ -68,6 +68,13 @@ class ReceiptBase(SQLModel):
 class Receipt(ReceiptBase, table=True):
     """Receipt model for database."""
 
+    __table_args__ = (
+        # Serves the per-user, newest-first listing (scanned backwards)
+        Index("ix_receipt_user_id_purchase_date", "user_id", "purchase_date"),
+        # Lets list_stores step through a user's distinct store names
+        Index("ix_receipt_user_id_store_name", "user_id", "store_name"),
+    )
+
     id: int | None = Field(
         default=None, primary_key=True, description="Unique identifier for the receipt"
     )
@@ -258,6 +265,68 @@ class ReceiptItemUpdate(SQLModel):
     )
 
 
+class ReceiptFilterParams(SQLModel):
+    """Query parameters for filtering receipt listings and exports."""
+
+    search: str | None = Field(
+        default=None,
+        description="Search store name (case-insensitive partial match)",
+    )
+    store: str | None = Field(default=None, description="Exact store name match")
+    after: datetime | None = Field(
+        default=None,
+        description="Filter receipts on or after this date (ISO 8601 format)",
+    )
+    before: datetime | None = Field(
+        default=None,
+        description="Filter receipts on or before this date (ISO 8601 format)",
+    )
+    category_ids: list[int] | None = Field(
+        default=None,
+        description="Filter by category IDs (receipts with items in these categories)",
+    )
+    min_amount: Decimal | None = Field(
+        default=None, ge=0, description="Minimum total amount"
+    )
+    max_amount: Decimal | None = Field(
+        default=None, ge=0, description="Maximum total amount"
+    )
+
+
+class ReceiptListParams(ReceiptFilterParams):
+    """Query parameters for listing receipts."""
+
+    skip: int = Field(default=0, description="Number of receipts to skip")
+    limit: int = Field(default=100, description="Maximum number of receipts to return")
+
+
+class ReceiptExportParams(ReceiptFilterParams):
+    """Query parameters for exporting receipts as data."""
+
+    format: Literal["csv", "jsonl"] = Field(
+        default="csv",
+        description="csv: one row per item; jsonl: one receipt JSON object per line",
+    )
+
+
+class ReceiptPdfExportParams(ReceiptFilterParams):
+    """Query parameters for exporting receipts to PDF."""
+
+    include_images: bool = Field(
+        default=False, description="Include receipt images in the PDF"
+    )
+
+
+class ReceiptImageBatchRequest(SQLModel):
+    """Schema for downloading several receipt images in one archive."""
+
+    receipt_ids: list[int] = Field(
+        min_length=1,
+        max_length=100,
+        description="IDs of the receipts whose images to download",
+    )
+
+
 # Response Schemas
 class ReceiptItemRead(ReceiptItemBase):
     """Schema for reading a receipt item."""
@@ -1,21 +1,29 @@
+import hashlib
 import mimetypes
-from collections.abc import Sequence
-from datetime import UTC, datetime
-from decimal import Decimal
-from io import BytesIO
-from typing import Annotated
-
-from fastapi import APIRouter, File, Query, UploadFile, status
+import time
+import zipfile
+import zlib
+from collections.abc import AsyncIterator, Iterator
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Annotated, Any
+
+from fastapi import APIRouter, File, Query, Request, Response, UploadFile, status
 from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import TypeAdapter
 
-from app.auth.deps import CurrentUser, CurrentUserFromRequest, require_user_id
+from app.auth.deps import CurrentUserId, CurrentUserIdFromRequest
 from app.receipt.deps import ReceiptDeps
 from app.receipt.models import (
-    Receipt,
-    ReceiptItem,
+    ReceiptExportParams,
+    ReceiptFilterParams,
+    ReceiptImageBatchRequest,
     ReceiptItemCreateRequest,
     ReceiptItemRead,
     ReceiptItemUpdate,
+    ReceiptListParams,
+    ReceiptPdfExportParams,
     ReceiptRead,
     ReceiptReconcileSuggestion,
     ReceiptUpdate,
@@ -24,103 +32,186 @@ from app.receipt.services import ReceiptFilters
 
 router = APIRouter(prefix="/api/v1/receipts", tags=["receipts"])
 
+# Built once at import so every JSON endpoint serializes straight to bytes
+_READ_ADAPTER = TypeAdapter(ReceiptRead)
+_READ_LIST_ADAPTER = TypeAdapter(list[ReceiptRead])
+_ITEM_LIST_ADAPTER = TypeAdapter(list[ReceiptItemRead])
+_STORES_ADAPTER = TypeAdapter(list[str])
+_RECONCILE_ADAPTER = TypeAdapter(ReceiptReconcileSuggestion)
+
+# zlib window bits selecting the gzip container (16 + max window size)
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
 
-def build_receipt_filters(
-    search: str | None,
-    store: str | None,
-    after: datetime | None,
-    before: datetime | None,
-    category_ids: list[int] | None,
-    min_amount: Decimal | None,
-    max_amount: Decimal | None,
-) -> ReceiptFilters:
-    """Build a ReceiptFilters dictionary from query parameters.
-
-    Only includes parameters that are not None.
-
-    Args:
-        search: Search term for store name
-        store: Exact store name match
-        after: Filter receipts on or after this date
-        before: Filter receipts on or before this date
-        category_ids: Filter by category IDs
-        min_amount: Minimum total amount
-        max_amount: Maximum total amount
-
-    Returns:
-        Dictionary with only non-None filter values
+def _json_response(
+    adapter: TypeAdapter[Any],
+    data: object,
+    status_code: int = status.HTTP_200_OK,
+) -> Response:
+    """Validate ORM data against a read schema and return it as a JSON response.
+
+    Skips FastAPI's jsonable_encoder pass; the response_model on the route
+    is kept for the OpenAPI schema only.
     """
-    filters: ReceiptFilters = {}
-    if search is not None:
-        filters["search"] = search
-    if store is not None:
-        filters["store"] = store
-    if after is not None:
-        filters["after"] = after
-    if before is not None:
-        filters["before"] = before
-    if category_ids is not None:
-        filters["category_ids"] = category_ids
-    if min_amount is not None:
-        filters["min_amount"] = min_amount
-    if max_amount is not None:
-        filters["max_amount"] = max_amount
-    return filters
+    payload = adapter.validate_python(data, from_attributes=True)
+    return Response(
+        content=adapter.dump_json(payload),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+@lru_cache(maxsize=1)
+def _export_timestamp(epoch_second: int) -> str:
+    """Format an export filename timestamp (UTC), reused within the same second."""
+    return time.strftime("%Y%m%d_%H%M%S", time.gmtime(epoch_second))
+
+
+@lru_cache(maxsize=32)
+def _guess_media_type(suffix: str) -> str:
+    """Guess an image media type from its (lowercased) file suffix."""
+    media_type, _ = mimetypes.guess_type(f"x{suffix}")
+    return media_type or "application/octet-stream"
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Check whether an Accept-Encoding header value allows a gzip response.
+
+    An explicit gzip entry decides on its own; a "*" wildcard only applies when
+    gzip is not listed.
+    """
+    wildcard_quality: float | None = None
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        name = name.strip().lower()
+        if name not in ("gzip", "*"):
+            continue
+        try:
+            quality = float(params.replace(" ", "").removeprefix("q=") or 1)
+        except ValueError:
+            quality = 0.0
+        if name == "gzip":
+            return quality > 0
+        wildcard_quality = quality
+    return wildcard_quality is not None and wildcard_quality > 0
+
+
+async def _gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip-encode a byte stream, flushing after each chunk so it keeps streaming."""
+    compressor = zlib.compressobj(wbits=_GZIP_WBITS)
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weakly compare an If-None-Match header value against an ETag."""
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags or "*" in tags
+
+
+def _is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """Check the request's conditional headers against an image's validators."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except ValueError:
+            return False
+        return int(mtime) <= since.timestamp()
+    return False
+
+
+class _ZipChunkSink:
+    """Write-only, unseekable sink so zipfile streams its archive in chunks.
+
+    Implements the write/flush/close protocol ZipFile writes through, plus tell
+    so member offsets can still be recorded.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._offset = 0
+
+    def write(self, data: bytes, /) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        """Return and forget everything written since the last drain."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iter_images_zip(images: list[tuple[int, Path]]) -> Iterator[bytes]:
+    """Stream receipt images as a zip archive, one member per chunk."""
+    sink = _ZipChunkSink()
+    # Images are already compressed; storing them avoids burning CPU for nothing
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        for receipt_id, path in images:
+            archive.write(path, arcname=f"receipt_{receipt_id}{path.suffix.lower()}")
+            yield sink.drain()
+    yield sink.drain()
+
+
+_FILTER_FIELDS = tuple(ReceiptFilterParams.model_fields)
+
+
+def build_receipt_filters(params: ReceiptFilterParams) -> ReceiptFilters | None:
+    """Build a ReceiptFilters dictionary from the filter query parameters.
+
+    Only includes filter parameters that are not None; returns None when no
+    filter is set.
+    """
+    # Unfiltered requests (the common first page) never build the dict
+    if params.model_fields_set.isdisjoint(_FILTER_FIELDS):
+        return None
+
+    filters = {
+        name: value
+        for name in _FILTER_FIELDS
+        if (value := getattr(params, name)) is not None
+    }
+    return ReceiptFilters(**filters) or None
 
 
 @router.post("/scan", response_model=ReceiptRead, status_code=status.HTTP_201_CREATED)
 async def create_receipt_from_scan(
     *,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
     image: Annotated[UploadFile, File()],
-) -> ReceiptRead:
+) -> Response:
     """
     Upload and scan a receipt image.
     The image will be analyzed using AI to extract information.
     The receipt and items will be created in the database.
     """
-    user_id = require_user_id(current_user)
-    return await service.create_from_scan(image, user_id=user_id)
+    receipt = await service.create_from_scan(image, user_id=user_id)
+    return _json_response(_READ_ADAPTER, receipt, status.HTTP_201_CREATED)
 
 
 @router.get("", response_model=list[ReceiptRead], status_code=status.HTTP_200_OK)
 async def list_receipts(
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
-    skip: int = 0,
-    limit: int = 100,
-    search: Annotated[
-        str | None,
-        Query(description="Search store name (case-insensitive partial match)"),
-    ] = None,
-    store: Annotated[
-        str | None,
-        Query(description="Exact store name match"),
-    ] = None,
-    after: Annotated[
-        datetime | None,
-        Query(description="Filter receipts on or after this date (ISO 8601 format)"),
-    ] = None,
-    before: Annotated[
-        datetime | None,
-        Query(description="Filter receipts on or before this date (ISO 8601 format)"),
-    ] = None,
-    category_ids: Annotated[
-        list[int] | None,
-        Query(
-            description="Filter by category IDs (receipts with items in these categories)"
-        ),
-    ] = None,
-    min_amount: Annotated[
-        Decimal | None,
-        Query(description="Minimum total amount", ge=0),
-    ] = None,
-    max_amount: Annotated[
-        Decimal | None,
-        Query(description="Maximum total amount", ge=0),
-    ] = None,
-) -> Sequence[Receipt]:
+    params: Annotated[ReceiptListParams, Query()],
+) -> Response:
     """List all receipts with optional filtering.
 
     Filter options:
@@ -130,148 +221,82 @@ async def list_receipts(
     - category_ids: Filter receipts that have items in specified categories
     - min_amount/max_amount: Total amount range filter
     """
-    user_id = require_user_id(current_user)
     # Build filters dict using helper function
-    filters = build_receipt_filters(
-        search, store, after, before, category_ids, min_amount, max_amount
-    )
+    filters = build_receipt_filters(params)
 
     receipts = await service.list(
-        skip=skip, limit=limit, filters=filters or None, user_id=user_id
+        skip=params.skip, limit=params.limit, filters=filters, user_id=user_id
     )
-    return receipts  # pragma: no cover
+    return _json_response(_READ_LIST_ADAPTER, receipts)
 
 
 @router.get("/export", status_code=status.HTTP_200_OK)
 async def export_receipts(
-    current_user: CurrentUser,
+    request: Request,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
-    search: Annotated[
-        str | None,
-        Query(description="Search store name (case-insensitive partial match)"),
-    ] = None,
-    store: Annotated[
-        str | None,
-        Query(description="Exact store name match"),
-    ] = None,
-    after: Annotated[
-        datetime | None,
-        Query(description="Filter receipts on or after this date (ISO 8601 format)"),
-    ] = None,
-    before: Annotated[
-        datetime | None,
-        Query(description="Filter receipts on or before this date (ISO 8601 format)"),
-    ] = None,
-    category_ids: Annotated[
-        list[int] | None,
-        Query(
-            description="Filter by category IDs (receipts with items in these categories)"
-        ),
-    ] = None,
-    min_amount: Annotated[
-        Decimal | None,
-        Query(description="Minimum total amount", ge=0),
-    ] = None,
-    max_amount: Annotated[
-        Decimal | None,
-        Query(description="Maximum total amount", ge=0),
-    ] = None,
+    params: Annotated[ReceiptExportParams, Query()],
 ) -> StreamingResponse:
-    """Export receipts to CSV format with optional filtering.
+    """Export receipts to CSV or JSON Lines format with optional filtering.
 
-    Returns a CSV file with all receipt and item data.
-    Filter options are the same as list_receipts endpoint.
+    CSV (the default) has one row per item with the receipt data repeated;
+    format=jsonl streams one receipt object (with its items) per line.
+    Filter options are the same as list_receipts endpoint. The stream is
+    gzip-encoded when the client accepts it.
     """
-    user_id = require_user_id(current_user)
     # Build filters dict using helper function
-    filters = build_receipt_filters(
-        search, store, after, before, category_ids, min_amount, max_amount
-    )
-
-    # Generate CSV content
-    csv_content = await service.export_to_csv(filters=filters or None, user_id=user_id)
+    filters = build_receipt_filters(params)
 
     # Generate filename with timestamp (UTC for consistency)
-    timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
-    filename = f"receipts_export_{timestamp}.csv"
-
-    # Convert string to bytes for streaming
-    csv_bytes = BytesIO(csv_content.encode("utf-8"))
+    timestamp = _export_timestamp(int(time.time()))
+    filename = f"receipts_export_{timestamp}.{params.format}"
+
+    if params.format == "jsonl":
+        content = service.export_to_jsonl(filters=filters, user_id=user_id)
+        media_type = "application/x-ndjson"
+    else:
+        content = service.export_to_csv(filters=filters, user_id=user_id)
+        media_type = "text/csv"
+
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "Vary": "Accept-Encoding",
+    }
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        content = _gzip_stream(content)
+        headers["Content-Encoding"] = "gzip"
 
     # Return streaming response with proper headers
-    return StreamingResponse(
-        csv_bytes,
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
+    return StreamingResponse(content, media_type=media_type, headers=headers)
 
 
 @router.get("/export/pdf", status_code=status.HTTP_200_OK)
 async def export_receipts_pdf(
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
-    search: Annotated[
-        str | None,
-        Query(description="Search store name (case-insensitive partial match)"),
-    ] = None,
-    store: Annotated[
-        str | None,
-        Query(description="Exact store name match"),
-    ] = None,
-    after: Annotated[
-        datetime | None,
-        Query(description="Filter receipts on or after this date (ISO 8601 format)"),
-    ] = None,
-    before: Annotated[
-        datetime | None,
-        Query(description="Filter receipts on or before this date (ISO 8601 format)"),
-    ] = None,
-    category_ids: Annotated[
-        list[int] | None,
-        Query(
-            description="Filter by category IDs (receipts with items in these categories)"
-        ),
-    ] = None,
-    min_amount: Annotated[
-        Decimal | None,
-        Query(description="Minimum total amount", ge=0),
-    ] = None,
-    max_amount: Annotated[
-        Decimal | None,
-        Query(description="Maximum total amount", ge=0),
-    ] = None,
-    include_images: Annotated[
-        bool,
-        Query(description="Include receipt images in the PDF"),
-    ] = False,
-) -> StreamingResponse:
+    params: Annotated[ReceiptPdfExportParams, Query()],
+) -> Response:
     """Export receipts to PDF format with optional filtering.
 
     Returns a PDF file with all receipt and item data.
     Optionally includes receipt images when include_images=true.
     Filter options are the same as list_receipts endpoint.
     """
-    user_id = require_user_id(current_user)
     # Build filters dict using helper function
-    filters = build_receipt_filters(
-        search, store, after, before, category_ids, min_amount, max_amount
-    )
+    filters = build_receipt_filters(params)
 
     # Generate PDF content
     pdf_content = await service.export_to_pdf(
-        filters=filters or None, user_id=user_id, include_images=include_images
+        filters=filters, user_id=user_id, include_images=params.include_images
     )
 
     # Generate filename with timestamp (UTC for consistency)
-    timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+    timestamp = _export_timestamp(int(time.time()))
     filename = f"receipts_export_{timestamp}.pdf"
 
-    # Convert bytes to BytesIO for streaming
-    pdf_bytes = BytesIO(pdf_content)
-
-    # Return streaming response with proper headers
-    return StreamingResponse(
-        pdf_bytes,
+    # The PDF is already in memory; send it as-is (no BytesIO copy, exact length)
+    return Response(
+        content=pdf_content,
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
@@ -279,23 +304,56 @@ async def export_receipts_pdf(
 
 @router.get("/stores", response_model=list[str], status_code=status.HTTP_200_OK)
 async def list_stores(
-    current_user: CurrentUser,
+    request: Request,
+    user_id: CurrentUserId,
+    service: ReceiptDeps,
+) -> Response:
+    """Get a list of unique store names for filtering.
+
+    The weak ETag is a digest of the encoded list, so a matching If-None-Match
+    is answered with 304 and no body.
+    """
+    stores = await service.list_stores(user_id=user_id)
+    content = _STORES_ADAPTER.dump_json(list(stores))
+    etag = f'W/"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@router.post("/images/batch", status_code=status.HTTP_200_OK)
+async def download_receipt_images(
+    batch: ReceiptImageBatchRequest,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
-) -> Sequence[str]:
-    """Get a list of unique store names for filtering."""
-    user_id = require_user_id(current_user)
-    return await service.list_stores(user_id=user_id)
+) -> StreamingResponse:
+    """Download several receipt images as a single zip archive.
+
+    Lets list views fetch a page of images in one request. Receipts that
+    don't exist, belong to another user, or have no stored image are skipped.
+    """
+    images = await service.get_image_paths(batch.receipt_ids, user_id=user_id)
+    timestamp = _export_timestamp(int(time.time()))
+    filename = f"receipt_images_{timestamp}.zip"
+    return StreamingResponse(
+        _iter_images_zip(images),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
 
 @router.get("/{receipt_id}", response_model=ReceiptRead, status_code=status.HTTP_200_OK)
 async def get_receipt(
     receipt_id: int,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
-) -> Receipt:
+) -> Response:
     """Get a receipt by ID with all its items."""
-    user_id = require_user_id(current_user)
-    return await service.get(receipt_id, user_id=user_id)
+    receipt = await service.get(receipt_id, user_id=user_id)
+    return _json_response(_READ_ADAPTER, receipt)
 
 
 @router.get(
@@ -304,15 +362,27 @@ async def get_receipt(
 )
 async def get_receipt_image(
     receipt_id: int,
-    current_user: CurrentUserFromRequest,
+    request: Request,
+    user_id: CurrentUserIdFromRequest,
     service: ReceiptDeps,
-) -> FileResponse:
-    """Get a receipt image for the current user."""
-    user_id = require_user_id(current_user)
+) -> Response:
+    """Get a receipt image for the current user.
+
+    Answers conditional requests with 304 when the stored image is unchanged.
+    """
     receipt = await service.get(receipt_id, user_id=user_id)
     image_path = service.resolve_image_path(receipt.image_path)
-    media_type, _ = mimetypes.guess_type(image_path.name)
-    return FileResponse(image_path, media_type=media_type or "application/octet-stream")
+    stat_result = image_path.stat()
+    etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+
+    if _is_not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    media_type = _guess_media_type(image_path.suffix.lower())
+    return FileResponse(
+        image_path, media_type=media_type, headers=headers, stat_result=stat_result
+    )
 
 
 @router.get(
@@ -322,19 +392,19 @@ async def get_receipt_image(
 )
 async def list_items_by_category(
     category_id: int,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
     skip: int = 0,
     limit: int = 100,
-) -> Sequence[ReceiptItem]:
+) -> Response:
     """List all receipt items in a category."""
-    user_id = require_user_id(current_user)
-    return await service.list_items_by_category(
+    items = await service.list_items_by_category(
         category_id=category_id,
         user_id=user_id,
         skip=skip,
         limit=limit,
     )
+    return _json_response(_ITEM_LIST_ADAPTER, items)
 
 
 @router.patch(
@@ -345,12 +415,12 @@ async def list_items_by_category(
 async def update_receipt(
     receipt_id: int,
     receipt_in: ReceiptUpdate,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
-) -> Receipt:
+) -> Response:
     """Update a receipt."""
-    user_id = require_user_id(current_user)
-    return await service.update(receipt_id, receipt_in, user_id=user_id)
+    receipt = await service.update(receipt_id, receipt_in, user_id=user_id)
+    return _json_response(_READ_ADAPTER, receipt)
 
 
 @router.post(
@@ -360,23 +430,28 @@ async def update_receipt(
 )
 async def reconcile_receipt(
     receipt_id: int,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
-) -> ReceiptReconcileSuggestion:
+) -> Response:
     """Suggest AI adjustments to reconcile receipt items with the receipt total."""
-    user_id = require_user_id(current_user)
-    return await service.reconcile_items(receipt_id, user_id=user_id)
+    suggestion = await service.reconcile_items(receipt_id, user_id=user_id)
+    return _json_response(_RECONCILE_ADAPTER, suggestion)
 
 
-@router.delete("/{receipt_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{receipt_id}",
+    response_class=Response,
+    status_code=status.HTTP_204_NO_CONTENT,
+)
 async def delete_receipt(
     receipt_id: int,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
-) -> None:
+) -> Response:
     """Delete a receipt and all its items."""
-    user_id = require_user_id(current_user)
     await service.delete(receipt_id, user_id=user_id)
+    # Built per request: middleware appends headers to the response in place
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.patch(
@@ -388,12 +463,12 @@ async def update_receipt_item(
     receipt_id: int,
     item_id: int,
     item_in: ReceiptItemUpdate,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
-) -> Receipt:
+) -> Response:
     """Update a receipt item."""
-    user_id = require_user_id(current_user)
-    return await service.update_item(receipt_id, item_id, item_in, user_id=user_id)
+    receipt = await service.update_item(receipt_id, item_id, item_in, user_id=user_id)
+    return _json_response(_READ_ADAPTER, receipt)
 
 
 @router.post(
@@ -404,15 +479,15 @@ async def update_receipt_item(
 async def create_receipt_item(
     receipt_id: int,
     item_in: ReceiptItemCreateRequest,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
-) -> Receipt:
+) -> Response:
     """Create a new item for a receipt.
 
     Creates the item and returns the updated receipt.
     """
-    user_id = require_user_id(current_user)
-    return await service.create_item(receipt_id, item_in, user_id=user_id)
+    receipt = await service.create_item(receipt_id, item_in, user_id=user_id)
+    return _json_response(_READ_ADAPTER, receipt, status.HTTP_201_CREATED)
 
 
 @router.delete(
@@ -423,12 +498,12 @@ async def create_receipt_item(
 async def delete_receipt_item(
     receipt_id: int,
     item_id: int,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     service: ReceiptDeps,
-) -> Receipt:
+) -> Response:
     """Delete a receipt item.
 
     Deletes the item and returns the updated receipt with remaining items.
     """
-    user_id = require_user_id(current_user)
-    return await service.delete_item(receipt_id, item_id, user_id=user_id)
+    receipt = await service.delete_item(receipt_id, item_id, user_id=user_id)
+    return _json_response(_READ_ADAPTER, receipt)
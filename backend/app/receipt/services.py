@@ -1,20 +1,28 @@
+import asyncio
 import csv
 import os
+import shutil
 import uuid
-from collections import Counter
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Iterator, Sequence
 from datetime import UTC, datetime, timedelta
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
 from io import StringIO
 from pathlib import Path
-from typing import TypedDict
+from typing import Any, BinaryIO, TypedDict, cast
 
 from fastapi import UploadFile
 from PIL import Image
-from sqlmodel import col, select
+from pydantic import TypeAdapter
+from sqlalchemy import ColumnElement, Row, update
+from sqlalchemy import select as sa_select
+from sqlalchemy.orm import QueryableAttribute, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import col, func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
 
-from app.category.models import CategoryCreate
+from app.category.models import Category, CategoryCreate
 from app.category.services import CategoryService
 from app.core.config import settings
 from app.core.exceptions import BadRequestError, NotFoundError, ServiceUnavailableError
@@ -22,7 +30,6 @@ from app.integrations.pydantic_ai.receipt_agent import analyze_receipt
 from app.integrations.pydantic_ai.receipt_reconcile_agent import (
     analyze_reconciliation,
 )
-from app.receipt.exporters import ReceiptPDFGenerator
 from app.receipt.models import (
     Receipt,
     ReceiptCreate,
@@ -50,9 +57,113 @@ class ReceiptFilters(TypedDict, total=False):
     max_amount: Decimal | None
 
 
+# Relationship attributes as loader options expect them (SQLModel types them as
+# their Python values)
+_RECEIPT_ITEMS = cast(QueryableAttribute[list[ReceiptItem]], Receipt.items)
+_ITEM_CATEGORY = cast(QueryableAttribute[Category], ReceiptItem.category)
+
+# Loads a receipt's items with one SELECT ... IN and joins each item's category
+# into that same query, instead of a further selectin round-trip for categories
+_ITEMS_WITH_CATEGORY = selectinload(_RECEIPT_ITEMS).joinedload(_ITEM_CATEGORY)
+
+# Loads just a receipt's items, for single-receipt reads and writes
+_WITH_ITEMS = selectinload(_RECEIPT_ITEMS)
+
+_RECEIPT_READ_ADAPTER = TypeAdapter(ReceiptRead)
+
+_DEDUPE_TOLERANCE = Decimal("0.05")
+
+# Quantizer for converting AI-extracted float amounts to cents
+_CENT = Decimal("0.01")
+
+_UPLOAD_COPY_CHUNK_SIZE = 1024 * 1024
+
+# Leading bytes of the image formats accepted for scanning: JPEG, PNG, GIF, BMP
+# and little/big-endian TIFF (WebP is matched separately, its signature is
+# split around the RIFF chunk size)
+_IMAGE_SIGNATURES = (
+    b"\xff\xd8\xff",
+    b"\x89PNG\r\n\x1a\n",
+    b"GIF87a",
+    b"GIF89a",
+    b"BM",
+    b"II*\x00",
+    b"MM\x00*",
+)
+
+# Longest side, in pixels, of the image handed to the receipt analysis agent
+_AI_IMAGE_MAX_SIDE = 2048
+
+# Scanned uploads are stored as JPEGs at this quality, unless they already are
+# JPEGs no larger than the passthrough size
+_STORED_JPEG_QUALITY = 85
+_JPEG_PASSTHROUGH_MAX_BYTES = 2 * 1024 * 1024
+
+# Receipts fetched per round trip when streaming exports
+_EXPORT_BATCH_SIZE = 100
+
+# Column order of the flattened CSV export (one row per receipt item)
+_CSV_EXPORT_HEADER = (
+    "receipt_id",
+    "receipt_date",
+    "store_name",
+    "receipt_total",
+    "receipt_currency",
+    "payment_method",
+    "tax_amount",
+    "item_id",
+    "item_name",
+    "item_quantity",
+    "item_unit_price",
+    "item_total_price",
+    "item_currency",
+    "category_name",
+)
+
+# Flattened CSV export query: one row per item (or per item-less receipt), with
+# columns labelled by their _CSV_EXPORT_HEADER names
+_CSV_EXPORT_STMT = (
+    sa_select(
+        col(Receipt.id).label("receipt_id"),
+        col(Receipt.purchase_date).label("receipt_date"),
+        col(Receipt.store_name).label("store_name"),
+        col(Receipt.total_amount).label("receipt_total"),
+        col(Receipt.currency).label("receipt_currency"),
+        col(Receipt.payment_method).label("payment_method"),
+        col(Receipt.tax_amount).label("tax_amount"),
+        col(ReceiptItem.id).label("item_id"),
+        col(ReceiptItem.name).label("item_name"),
+        col(ReceiptItem.quantity).label("item_quantity"),
+        col(ReceiptItem.unit_price).label("item_unit_price"),
+        col(ReceiptItem.total_price).label("item_total_price"),
+        col(ReceiptItem.currency).label("item_currency"),
+        col(Category.name).label("category_name"),
+    )
+    .outerjoin(ReceiptItem, col(ReceiptItem.receipt_id) == col(Receipt.id))
+    .outerjoin(Category, col(Category.id) == col(ReceiptItem.category_id))
+    .order_by(col(Receipt.purchase_date).desc(), col(Receipt.id), col(ReceiptItem.id))
+)
+
+# Translation table for escaping the store search ILIKE pattern
+_LIKE_ESCAPE_TABLE = str.maketrans({"\\": "\\\\", "%": "\\%", "_": "\\_"})
+
+
+@lru_cache(maxsize=8)
+def _resolve_upload_root(upload_dir: Path) -> Path:
+    """Resolve the upload directory once instead of on every image lookup."""
+    return upload_dir.resolve()
+
+
+def _now() -> datetime:
+    """Return the current UTC time used to stamp receipt and item updates."""
+    return datetime.now(UTC)
+
+
 CentsList = list[int]
+BitsetList = list[int]
 ReceiptItemList = list[ReceiptItem]
 ReceiptItemAdjustmentList = list[ReceiptItemAdjustment]
+ReceiptImageList = list[tuple[int, Path]]
 
 
 class ReceiptService:
@@ -73,7 +184,13 @@ class ReceiptService:
     @staticmethod
     def _to_cents(amount: Decimal) -> int:
         """Convert a decimal amount to integer cents."""
-        return int((amount * 100).quantize(Decimal("1")))
+        # Shift the exponent by two places, then round half-even like quantize
+        return int(amount.scaleb(2).to_integral_value())
+
+    @staticmethod
+    def _to_money(amount: float) -> Decimal:
+        """Convert a float amount to a Decimal rounded (half up) to cents."""
+        return Decimal(amount).quantize(_CENT, rounding=ROUND_HALF_UP)
 
     @staticmethod
     def _is_better_subset(
@@ -87,6 +204,28 @@ class ReceiptService:
             return candidate_count > current_count
         return candidate_score > current_score
 
+    @staticmethod
+    def _suffix_reachable_sums(
+        item_totals_cents: CentsList, target_cents: int
+    ) -> BitsetList | None:
+        """Build bitsets of the sums (up to target) reachable from each line onward.
+
+        Bit ``s`` of ``result[idx]`` is set when some subset of
+        ``item_totals_cents[idx:]`` sums to ``s`` cents. Returns None when a line
+        is negative, since a capped bitset cannot represent those sums.
+        """
+        if target_cents < 0 or any(amount < 0 for amount in item_totals_cents):
+            return None
+
+        full_mask = (1 << (target_cents + 1)) - 1
+        reachable = [0] * (len(item_totals_cents) + 1)
+        reach = 1  # Only the empty sum is reachable past the last line
+        reachable[-1] = reach
+        for idx in range(len(item_totals_cents) - 1, -1, -1):
+            reach |= (reach << item_totals_cents[idx]) & full_mask
+            reachable[idx] = reach
+        return reachable
+
     def _find_subset_indices_matching_total(
         self, item_totals_cents: CentsList, target_cents: int
     ) -> set[int] | None:
@@ -97,14 +236,25 @@ class ReceiptService:
         2. Preferring earlier lines when counts tie
         """
         n_items = len(item_totals_cents)
+        reachable = self._suffix_reachable_sums(item_totals_cents, target_cents)
+        if reachable is not None and not (reachable[0] >> target_cents) & 1:
+            return None
+
         best_by_sum: dict[int, tuple[int, int, tuple[int, ...]]] = {0: (0, 0, ())}
 
         for idx, amount_cents in enumerate(item_totals_cents):
+            remaining = reachable[idx + 1] if reachable is not None else None
             existing_states = list(best_by_sum.items())
             for current_sum, state in existing_states:
                 next_sum = current_sum + amount_cents
                 if next_sum > target_cents:
                     continue
+                # Skip sums the remaining lines can no longer complete to target.
+                if (
+                    remaining is not None
+                    and not (remaining >> (target_cents - next_sum)) & 1
+                ):
+                    continue
 
                 count, score, indices = state
                 # Larger score means the subset keeps earlier lines.
@@ -125,7 +275,7 @@ class ReceiptService:
         items: ReceiptItemList,
         expected_total: Decimal,
         *,
-        tolerance: Decimal = Decimal("0.05"),
+        tolerance: Decimal = _DEDUPE_TOLERANCE,
     ) -> tuple[ReceiptItemList, ReceiptItemList, str | None]:
         """Drop clearly duplicated OCR lines when item sum exceeds receipt total.
 
@@ -150,32 +300,33 @@ class ReceiptService:
         if len(items) > 120 or expected_total_cents > 500_000:
             return items, [], None
 
+        # Removed lines must be duplicates, so skip the subset search when
+        # no two lines share a signature.
+        if not self._has_duplicate_signature(items, item_totals_cents):
+            return items, [], None
+
         keep_indices = self._find_subset_indices_matching_total(
             item_totals_cents, expected_total_cents
         )
         if not keep_indices or len(keep_indices) == len(items):
             return items, [], None
 
-        removed_indices = sorted(set(range(len(items))) - keep_indices)
-        signatures = [
-            (
-                item.name.strip().upper(),
-                self._to_cents(item.total_price),
-                item.currency,
-            )
-            for item in items
-        ]
-        signature_counts = Counter(signatures)
+        filtered_items: ReceiptItemList = []
+        removed_items: ReceiptItemList = []
+        removed_indices: list[int] = []
+        for idx, item in enumerate(items):
+            if idx in keep_indices:
+                filtered_items.append(item)
+            else:
+                removed_items.append(item)
+                removed_indices.append(idx)
 
-        # Only auto-drop lines that look duplicated in extracted output.
-        if any(signature_counts[signatures[idx]] < 2 for idx in removed_indices):
+        if not self._removed_lines_have_duplicates(
+            items, item_totals_cents, removed_indices
+        ):
             return items, [], None
 
-        filtered_items = [items[idx] for idx in sorted(keep_indices)]
-        removed_items = [items[idx] for idx in removed_indices]
-        filtered_total_cents = sum(
-            self._to_cents(item.total_price) for item in filtered_items
-        )
+        filtered_total_cents = sum(item_totals_cents[idx] for idx in keep_indices)
         if abs(filtered_total_cents - expected_total_cents) > tolerance_cents:
             return items, [], None
 
@@ -185,6 +336,70 @@ class ReceiptService:
         )
         return filtered_items, removed_items, note
 
+    @staticmethod
+    def _has_duplicate_signature(
+        items: ReceiptItemList, item_totals_cents: CentsList
+    ) -> bool:
+        """Return True as soon as two lines share a dedupe signature.
+
+        Names are only normalized for lines whose cents total was already seen,
+        since duplicate signatures always share a total.
+        """
+        first_index_by_cents: dict[int, int] = {}
+        signatures: set[tuple[str, int, str]] = set()
+        for idx, (item, cents) in enumerate(zip(items, item_totals_cents, strict=True)):
+            first_idx = first_index_by_cents.setdefault(cents, idx)
+            if first_idx == idx:
+                continue
+            if first_idx >= 0:
+                # Second line with this total: register the first one as well
+                first_item = items[first_idx]
+                signatures.add(
+                    (first_item.name.strip().upper(), cents, first_item.currency)
+                )
+                first_index_by_cents[cents] = -1
+            signature = (item.name.strip().upper(), cents, item.currency)
+            if signature in signatures:
+                return True
+            signatures.add(signature)
+        return False
+
+    @staticmethod
+    def _removed_lines_have_duplicates(
+        items: ReceiptItemList,
+        item_totals_cents: CentsList,
+        removed_indices: Sequence[int],
+    ) -> bool:
+        """Check that every removed line repeats elsewhere in the extracted output.
+
+        Signatures are only built for lines whose cents total matches a removed
+        line, so receipts without duplicates skip the name normalization.
+        """
+        removed_signatures = {
+            (
+                items[idx].name.strip().upper(),
+                item_totals_cents[idx],
+                items[idx].currency,
+            )
+            for idx in removed_indices
+        }
+        removed_cents = {signature[1] for signature in removed_signatures}
+        signature_counts: dict[tuple[str, int, str], int] = {}
+        pending = set(removed_signatures)
+        for item, cents in zip(items, item_totals_cents, strict=True):
+            if cents not in removed_cents:
+                continue
+            signature = (item.name.strip().upper(), cents, item.currency)
+            if signature not in removed_signatures:
+                continue
+            count = signature_counts.get(signature, 0) + 1
+            signature_counts[signature] = count
+            if count >= 2:
+                pending.discard(signature)
+                if not pending:
+                    return True
+        return not pending
+
     def _fallback_duplicate_removal_adjustments(
         self, items: ReceiptItemList, expected_total: Decimal
     ) -> tuple[ReceiptItemAdjustmentList, str | None]:
@@ -205,6 +420,89 @@ class ReceiptService:
             )
         return adjustments, note
 
+    @staticmethod
+    def _is_supported_image(head: bytes) -> bool:
+        """Check an upload's leading bytes for a supported image signature."""
+        return head.startswith(_IMAGE_SIGNATURES) or (
+            head[:4] == b"RIFF" and head[8:12] == b"WEBP"
+        )
+
+    @staticmethod
+    def _copy_upload_to_disk(source: BinaryIO, destination: Path) -> int:
+        """Copy an uploaded file to disk and return the number of bytes written."""
+        with open(destination, "wb") as f:
+            shutil.copyfileobj(source, f, _UPLOAD_COPY_CHUNK_SIZE)
+            f.flush()
+            return os.fstat(f.fileno()).st_size
+
+    @staticmethod
+    def _store_as_jpeg(image_path: Path) -> Path:
+        """Re-encode a saved upload as a JPEG and return the path it now lives at.
+
+        Small JPEGs are kept as uploaded. Anything else (PNG, WebP, oversized
+        JPEGs) is rewritten at _STORED_JPEG_QUALITY with a .jpg suffix, keeping
+        the EXIF data so orientation survives, and the original is removed.
+        """
+        with Image.open(image_path) as image:
+            if (
+                image.format == "JPEG"
+                and image_path.stat().st_size <= _JPEG_PASSTHROUGH_MAX_BYTES
+            ):
+                return image_path
+
+            jpeg_path = image_path.with_suffix(".jpg")
+            partial_path = jpeg_path.with_suffix(".jpg.partial")
+            try:
+                if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+                    # JPEG has no alpha; flatten onto white rather than letting
+                    # transparent areas of scans and screenshots turn black
+                    rgba_image = image.convert("RGBA")
+                    rgb_image = Image.new("RGB", image.size, "white")
+                    rgb_image.paste(rgba_image, mask=rgba_image.getchannel("A"))
+                elif image.mode in ("RGB", "L"):
+                    rgb_image = image
+                else:
+                    rgb_image = image.convert("RGB")
+                rgb_image.save(
+                    partial_path,
+                    format="JPEG",
+                    quality=_STORED_JPEG_QUALITY,
+                    optimize=True,
+                    exif=image.getexif(),
+                )
+            except Exception:
+                partial_path.unlink(missing_ok=True)
+                raise
+
+        os.replace(partial_path, jpeg_path)
+        if jpeg_path != image_path:
+            image_path.unlink()
+        return jpeg_path
+
+    @staticmethod
+    def _load_image(image_path: Path) -> Image.Image:
+        """Open and fully decode an image, raising if the file is not a valid image.
+
+        Decoding up front validates the whole file in one pass, and the loaded
+        pixels are what the AI analysis encodes next. Large photos are scaled
+        down to _AI_IMAGE_MAX_SIDE first (JPEGs decode directly at a reduced
+        scale); the stored original is left untouched.
+        """
+        image = Image.open(image_path)
+        image.thumbnail(
+            (_AI_IMAGE_MAX_SIDE, _AI_IMAGE_MAX_SIDE), Image.Resampling.LANCZOS
+        )
+        image.load()
+        return image
+
+    @staticmethod
+    def _drain_csv_buffer(buffer: StringIO) -> bytes:
+        """Return the buffered CSV text as UTF-8 bytes and empty the buffer."""
+        chunk = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
     @staticmethod
     def _normalize_reconcile_reason(reason: str | None) -> str:
         """Normalize reconcile reasons to a concise single sentence for UI."""
@@ -219,8 +517,8 @@ class ReceiptService:
 
     def resolve_image_path(self, image_path: str) -> Path:
         """Resolve and validate receipt image path within upload directory."""
-        upload_root = settings.UPLOAD_DIR.resolve()
         upload_dir = settings.UPLOAD_DIR
+        upload_root = _resolve_upload_root(upload_dir)
         path = Path(image_path)
 
         if path.is_absolute():
@@ -234,13 +532,44 @@ class ReceiptService:
 
         resolved = candidate.resolve(strict=False)
 
-        if upload_root not in resolved.parents and resolved != upload_root:
+        if not resolved.is_relative_to(upload_root):
             raise NotFoundError("Receipt image not found")
         if not resolved.exists() or not resolved.is_file():
             raise NotFoundError("Receipt image not found")
 
         return resolved
 
+    async def get_image_paths(
+        self, receipt_ids: Sequence[int], user_id: int
+    ) -> ReceiptImageList:
+        """Resolve the stored images of several receipts with a single query.
+
+        Receipts that don't belong to the user or whose image is missing are
+        skipped.
+
+        Args:
+            receipt_ids: The IDs of the receipts whose images to resolve.
+            user_id: The ID of the user who owns the receipts.
+
+        Returns:
+            (receipt_id, image path) pairs ordered by receipt ID.
+        """
+        stmt = (
+            select(Receipt.id, Receipt.image_path)
+            .where(col(Receipt.id).in_(receipt_ids))
+            .where(col(Receipt.user_id) == user_id)
+            .order_by(col(Receipt.id))
+        )
+        rows = (await self.session.exec(stmt)).all()
+
+        image_paths: list[tuple[int, Path]] = []
+        for receipt_id, image_path in rows:
+            try:
+                image_paths.append((receipt_id, self.resolve_image_path(image_path)))
+            except NotFoundError:
+                continue
+        return image_paths
+
     async def create(self, receipt_in: ReceiptCreate, user_id: int) -> Receipt:
         """Create a new receipt."""
         receipt = Receipt(**receipt_in.model_dump(), user_id=user_id)
@@ -273,31 +602,47 @@ class ReceiptService:
         image_path = settings.UPLOAD_DIR / unique_filename
 
         try:
-            # Save the uploaded file with size enforcement
-            max_bytes = settings.max_upload_size_bytes
-            bytes_read = 0
-            with open(image_path, "wb") as f:
-                while True:
-                    chunk = await image_file.read(1024 * 1024)
-                    if not chunk:
-                        break
-                    bytes_read += len(chunk)
-                    if bytes_read > max_bytes:
-                        raise BadRequestError(
-                            f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE_MB}MB."
-                        )
-                    f.write(chunk)
-
-            # Open and validate the image
+            # Reject oversized or non-image uploads before anything is copied
+            if (
+                image_file.size is not None
+                and image_file.size > settings.max_upload_size_bytes
+            ):
+                raise BadRequestError(
+                    f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE_MB}MB."
+                )
+            if not self._is_supported_image(await image_file.read(12)):
+                raise BadRequestError(
+                    "Invalid image file: only JPEG, PNG, WebP, GIF, BMP and TIFF "
+                    "images are supported"
+                )
+
+            # Save the uploaded file in a worker thread while the existing
+            # categories (used to help the AI model) are fetched
+            await image_file.seek(0)
+            copy_to_disk = asyncio.create_task(
+                asyncio.to_thread(
+                    self._copy_upload_to_disk, image_file.file, image_path
+                )
+            )
             try:
-                pil_image = Image.open(image_path)
-                pil_image.verify()  # Verify it's a valid image
-                pil_image = Image.open(image_path)  # Re-open after verify
+                categories = await self.category_service.list(user_id=user_id)
+            finally:
+                # The copy always finishes before the cleanup below can run
+                bytes_written = await copy_to_disk
+
+            # Enforce the upload size limit
+            if bytes_written > settings.max_upload_size_bytes:
+                raise BadRequestError(
+                    f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE_MB}MB."
+                )
+
+            # Store the image as JPEG, then open and validate it, off the event loop
+            try:
+                image_path = await asyncio.to_thread(self._store_as_jpeg, image_path)
+                pil_image = await asyncio.to_thread(self._load_image, image_path)
             except Exception as e:
                 raise BadRequestError(f"Invalid image file: {e}") from e
 
-            # Get existing categories to help the AI model
-            categories = await self.category_service.list(user_id=user_id)
             category_dicts = [
                 {"name": cat.name, "description": cat.description or ""}
                 for cat in categories
@@ -312,7 +657,7 @@ class ReceiptService:
             # Create receipt record
             receipt_create = ReceiptCreate(
                 store_name=receipt_data.store_name,
-                total_amount=Decimal(str(receipt_data.total_amount)),
+                total_amount=self._to_money(receipt_data.total_amount),
                 currency=receipt_data.currency,
                 purchase_date=receipt_data.date,
                 image_path=str(image_path),
@@ -325,36 +670,42 @@ class ReceiptService:
                 )
             receipt_id = receipt.id
 
+            # Reuse the categories fetched for the prompt, then resolve any other
+            # names at once, creating the missing ones
+            categories_by_name = {cat.name: cat for cat in categories}
+            unresolved = [
+                CategoryCreate(
+                    name=item_data.category.name,
+                    description=item_data.category.description,
+                )
+                for item_data in receipt_data.items
+                if item_data.category.name not in categories_by_name
+            ]
+            if unresolved:
+                resolved = await self.category_service.get_or_create_by_names(
+                    unresolved, user_id=user_id
+                )
+                categories_by_name.update(resolved)
+
             # Process each item
             receipt_items: list[ReceiptItem] = []
             for item_data in receipt_data.items:
-                # Get or create category
-                category = await self.category_service.get_by_name(
-                    item_data.category.name, user_id=user_id
-                )
-                if not category:
-                    category_create = CategoryCreate(
-                        name=item_data.category.name,
-                        description=item_data.category.description,
-                    )
-                    category = await self.category_service.create(
-                        category_create, user_id=user_id
-                    )
+                category = categories_by_name[item_data.category.name]
 
                 # Calculate quantity and prices (guard against zero/negative from AI)
                 raw_quantity = item_data.quantity if item_data.quantity >= 1 else 1
                 quantity = int(raw_quantity) if raw_quantity.is_integer() else 1
 
-                # Round to 2 decimal places to avoid floating point precision issues
-                unit_price = round(item_data.price / raw_quantity, 2)
-                total_price = round(item_data.price, 2)
+                # Quantize to cents straight from the float, no string round trip
+                unit_price = self._to_money(item_data.price / raw_quantity)
+                total_price = self._to_money(item_data.price)
 
                 # Create receipt item
                 receipt_item = ReceiptItem(
                     name=item_data.name,
                     quantity=quantity,
-                    unit_price=Decimal(str(unit_price)),
-                    total_price=Decimal(str(total_price)),
+                    unit_price=unit_price,
+                    total_price=total_price,
                     currency=item_data.currency,
                     category_id=category.id,
                     receipt_id=receipt_id,
@@ -372,16 +723,17 @@ class ReceiptService:
                     else auto_note
                 )
 
-            for item in receipt_items:
-                self.session.add(item)
+            self.session.add_all(receipt_items)
             await self.session.flush()
 
-            # Get the updated receipt with items
-            scanned_receipt = await self.get(receipt_id, user_id=user_id)
-            scan_response = ReceiptRead.model_validate(scanned_receipt)
+            # The flushed items are exactly the receipt's collection, so populate
+            # it directly instead of selecting them back
+            set_committed_value(receipt, "items", receipt_items)
+            scan_response = ReceiptRead.model_validate(receipt)
             if removed_items:
+                # Values come from already-validated ReceiptItem rows
                 scan_response.scan_removed_items = [
-                    ScanRemovedItem(
+                    ScanRemovedItem.model_construct(
                         name=item.name,
                         quantity=item.quantity,
                         unit_price=item.unit_price,
@@ -401,17 +753,19 @@ class ReceiptService:
 
     async def get(self, receipt_id: int, user_id: int) -> Receipt:
         """Get a receipt by ID."""
-        stmt = select(Receipt).where(
-            Receipt.id == receipt_id, col(Receipt.user_id) == user_id
+        # Load items in the same call instead of a follow-up refresh; refresh
+        # an already-loaded instance so a stale items collection is replaced
+        stmt = (
+            select(Receipt)
+            .where(Receipt.id == receipt_id, col(Receipt.user_id) == user_id)
+            .options(_WITH_ITEMS)
+            .execution_options(populate_existing=True)
         )
         receipt = await self.session.scalar(stmt)
 
         if not receipt:
             raise NotFoundError(f"Receipt with id {receipt_id} not found")
 
-        # Ensure items are loaded
-        await self.session.refresh(receipt, ["items"])
-
         return receipt
 
     async def list(
@@ -439,56 +793,85 @@ class ReceiptService:
         Returns:
             List of receipts matching the filters
         """
-        # Build base query (items are eagerly loaded via relationship's lazy="selectin")
-        stmt = select(Receipt).where(col(Receipt.user_id) == user_id)
-
-        # Apply filters if provided
-        if filters:
-            # Search filter (case-insensitive partial match on store_name)
-            if search := filters.get("search"):
-                # Escape SQL LIKE wildcards to prevent unexpected matches
-                escaped_search = (
-                    search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
-                )
-                stmt = stmt.where(
-                    col(Receipt.store_name).ilike(f"%{escaped_search}%", escape="\\")
-                )
-
-            # Exact store name match
-            if store := filters.get("store"):
-                stmt = stmt.where(col(Receipt.store_name) == store)
-
-            # Date range filters
-            if after := filters.get("after"):
-                stmt = stmt.where(col(Receipt.purchase_date) >= after)
-            if before := filters.get("before"):
-                # Add 1 day to include entire selected day (before comes as midnight)
-                stmt = stmt.where(
-                    col(Receipt.purchase_date) < before + timedelta(days=1)
-                )
-
-            # Amount range filters
-            if (min_amount := filters.get("min_amount")) is not None:
-                stmt = stmt.where(col(Receipt.total_amount) >= min_amount)
-            if (max_amount := filters.get("max_amount")) is not None:
-                stmt = stmt.where(col(Receipt.total_amount) <= max_amount)
-
-            # Category filter (join with items table)
-            if category_ids := filters.get("category_ids"):
-                stmt = (
-                    stmt.join(ReceiptItem)
-                    .where(col(ReceiptItem.category_id).in_(category_ids))
-                    .distinct()
-                )
-
-        # Apply pagination and ordering (newest first)
-        stmt = stmt.order_by(col(Receipt.purchase_date).desc()).offset(skip)
+        stmt = self._build_list_stmt(filters=filters, user_id=user_id).offset(skip)
         if limit is not None:
             stmt = stmt.limit(limit)
 
         results = await self.session.exec(stmt)
         return results.all()
 
+    async def _stream_receipts(
+        self, *, filters: ReceiptFilters | None = None, user_id: int
+    ) -> AsyncIterator[Receipt]:
+        """Yield every receipt matching the filters, fetched in batches.
+
+        Used by the exports so unbounded result sets are not materialized at once.
+        """
+        stmt = self._build_list_stmt(filters=filters, user_id=user_id)
+        result = await self.session.stream_scalars(
+            stmt.execution_options(yield_per=_EXPORT_BATCH_SIZE)
+        )
+        async for receipt in result:
+            yield receipt
+
+    def _build_list_stmt(
+        self, *, filters: ReceiptFilters | None, user_id: int
+    ) -> SelectOfScalar[Receipt]:
+        """Build the filtered, newest-first receipt query shared by list and exports."""
+        # Items and their categories are eagerly loaded up front
+        return (
+            select(Receipt)
+            .where(col(Receipt.user_id) == user_id, *self._filter_clauses(filters))
+            .options(_ITEMS_WITH_CATEGORY)
+            .order_by(col(Receipt.purchase_date).desc())
+        )
+
+    @staticmethod
+    def _filter_clauses(
+        filters: ReceiptFilters | None,
+    ) -> Sequence[ColumnElement[bool]]:
+        """Translate list filters into WHERE clauses on the receipts table."""
+        clauses: list[ColumnElement[bool]] = []
+        if not filters:
+            return clauses
+
+        # Search filter (case-insensitive partial match on store_name)
+        if search := filters.get("search"):
+            # Escape SQL LIKE wildcards to prevent unexpected matches
+            escaped_search = search.translate(_LIKE_ESCAPE_TABLE)
+            clauses.append(
+                col(Receipt.store_name).ilike(f"%{escaped_search}%", escape="\\")
+            )
+
+        # Exact store name match
+        if store := filters.get("store"):
+            clauses.append(col(Receipt.store_name) == store)
+
+        # Date range filters
+        if after := filters.get("after"):
+            clauses.append(col(Receipt.purchase_date) >= after)
+        if before := filters.get("before"):
+            # Add 1 day to include entire selected day (before comes as midnight)
+            clauses.append(col(Receipt.purchase_date) < before + timedelta(days=1))
+
+        # Amount range filters
+        if (min_amount := filters.get("min_amount")) is not None:
+            clauses.append(col(Receipt.total_amount) >= min_amount)
+        if (max_amount := filters.get("max_amount")) is not None:
+            clauses.append(col(Receipt.total_amount) <= max_amount)
+
+        # Category filter (receipts with at least one item in the categories)
+        if category_ids := filters.get("category_ids"):
+            clauses.append(
+                col(Receipt.id).in_(
+                    select(col(ReceiptItem.receipt_id)).where(
+                        col(ReceiptItem.category_id).in_(category_ids)
+                    )
+                )
+            )
+
+        return clauses
+
     async def list_stores(self, user_id: int) -> Sequence[str]:
         """Get a list of unique store names for a specific user.
 
@@ -498,11 +881,27 @@ class ReceiptService:
         Returns:
             Sorted list of unique store names from the user's receipts.
         """
+        # Loose index scan: start from the smallest name and repeatedly jump to
+        # the next larger one, so each distinct store costs one index probe on
+        # (user_id, store_name) instead of reading every receipt
+        owned = col(Receipt.user_id) == user_id
+        stores = (
+            select(func.min(Receipt.store_name).label("store_name"))
+            .where(owned)
+            .cte("stores", recursive=True)
+        )
+        next_store = (
+            select(func.min(Receipt.store_name))
+            .where(owned, col(Receipt.store_name) > stores.c.store_name)
+            .scalar_subquery()
+        )
+        stores = stores.union_all(
+            select(next_store).where(stores.c.store_name.is_not(None))
+        )
         stmt = (
-            select(Receipt.store_name)
-            .where(col(Receipt.user_id) == user_id)
-            .distinct()
-            .order_by(Receipt.store_name)
+            select(stores.c.store_name)
+            .where(stores.c.store_name.is_not(None))
+            .order_by(stores.c.store_name)
         )
         results = await self.session.exec(stmt)
         return results.all()
@@ -511,9 +910,6 @@ class ReceiptService:
         self, receipt_id: int, receipt_in: ReceiptUpdate, user_id: int
     ) -> Receipt:
         """Update a receipt."""
-        # Get the receipt from the database
-        receipt = await self.get(receipt_id, user_id)
-
         # Prepare update data
         update_data = receipt_in.model_dump(exclude_unset=True, exclude={"id"})
 
@@ -521,11 +917,21 @@ class ReceiptService:
         if "tags" in update_data and update_data["tags"] is None:
             update_data["tags"] = []
 
-        # Update the receipt
-        receipt.sqlmodel_update(update_data)
-        receipt.updated_at = datetime.now(UTC)
-        await self.session.flush()
-        await self.session.refresh(receipt, ["items"])
+        # Update the receipt and read it back in one UPDATE ... RETURNING; the
+        # ownership check is part of the WHERE clause and items load alongside,
+        # replacing any items collection already loaded in the session
+        stmt = (
+            update(Receipt)
+            .where(col(Receipt.id) == receipt_id, col(Receipt.user_id) == user_id)
+            .values(**update_data, updated_at=_now())
+            .returning(Receipt)
+            .options(_WITH_ITEMS)
+            .execution_options(populate_existing=True)
+        )
+        receipt = await self.session.scalar(stmt)
+
+        if not receipt:
+            raise NotFoundError(f"Receipt with id {receipt_id} not found")
 
         return receipt
 
@@ -545,7 +951,8 @@ class ReceiptService:
         receipt = await self.get(receipt_id, user_id)
 
         # Find the item in the receipt
-        item = next((i for i in receipt.items if i.id == item_id), None)
+        items_by_id = {i.id: i for i in receipt.items if i.id is not None}
+        item = items_by_id.get(item_id)
         if not item:
             raise NotFoundError(
                 f"Item with id {item_id} not found in receipt {receipt_id}"
@@ -555,12 +962,11 @@ class ReceiptService:
         update_data = item_in.model_dump(exclude_unset=True)
         item.sqlmodel_update(update_data)
         item.total_price = item.unit_price * item.quantity
-        item.updated_at = datetime.now(UTC)
-
-        receipt.updated_at = datetime.now(UTC)
+        now = _now()
+        item.updated_at = now
+        receipt.updated_at = now
 
         await self.session.flush()
-        await self.session.refresh(receipt, ["items"])
 
         return receipt
 
@@ -573,7 +979,7 @@ class ReceiptService:
         if not receipt.items:
             raise BadRequestError("Receipt has no items to reconcile")
 
-        receipt_total = Decimal(str(receipt.total_amount))
+        receipt_total = receipt.total_amount
         items_total = sum((item.total_price for item in receipt.items), Decimal("0"))
         difference = items_total - receipt_total
 
@@ -596,10 +1002,12 @@ class ReceiptService:
         except Exception as e:
             raise BadRequestError(f"Invalid receipt image: {e}") from e
 
+        items_by_id: dict[int, ReceiptItem] = {}
         items_context: list[dict[str, str | int | Decimal]] = []
         for item in receipt.items:
             if item.id is None:
                 raise ServiceUnavailableError("Receipt item missing ID")
+            items_by_id[item.id] = item
             items_context.append(
                 {
                     "id": item.id,
@@ -619,11 +1027,9 @@ class ReceiptService:
 
         notes: list[str] = []
 
-        valid_item_ids = {item.id for item in receipt.items if item.id is not None}
-
         adjustments_by_id: dict[int, ReceiptItemAdjustment] = {}
         for adjustment in analysis.adjustments:
-            if adjustment.item_id not in valid_item_ids:
+            if adjustment.item_id not in items_by_id:
                 notes.append(
                     f"Ignored adjustment for unknown item id {adjustment.item_id}."
                 )
@@ -663,15 +1069,12 @@ class ReceiptService:
                     }
                 )
 
-        # Validate adjustments and compute adjusted total
-        adjusted_total = Decimal("0")
-        for item in receipt.items:
-            if item.id is None:
-                raise ServiceUnavailableError("Receipt item missing ID")
-            adjustment = adjustments_by_id.get(item.id)
-            if adjustment and adjustment.remove:
-                continue
-            adjusted_total += item.total_price
+        # Every accepted adjustment is a removal of a known item
+        removed_total = sum(
+            (items_by_id[item_id].total_price for item_id in adjustments_by_id),
+            Decimal("0"),
+        )
+        adjusted_total = items_total - removed_total
 
         remaining_difference = adjusted_total - receipt_total
         if abs(remaining_difference) > Decimal("0.05"):
@@ -704,10 +1107,10 @@ class ReceiptService:
         receipt = await self.get(receipt_id, user_id=user_id)
 
         items = [ReceiptItem(**item.model_dump()) for item in items_in]
-        for item in items:
-            if receipt.id is not None:
+        if receipt.id is not None:
+            for item in items:
                 item.receipt_id = receipt.id
-            self.session.add(item)
+        self.session.add_all(items)
 
         await self.session.flush()
         return items
@@ -764,11 +1167,12 @@ class ReceiptService:
             select(Receipt)
             .where(Receipt.id == receipt_id, col(Receipt.user_id) == user_id)
             .with_for_update()
+            .options(_WITH_ITEMS)
+            .execution_options(populate_existing=True)
         )
         receipt = await self.session.scalar(stmt)
         if not receipt:
             raise NotFoundError(f"Receipt with id {receipt_id} not found")
-        await self.session.refresh(receipt, ["items"])
 
         # Validate currency matches the receipt
         if item_in.currency != receipt.currency:
@@ -794,10 +1198,9 @@ class ReceiptService:
         self.session.add(item)
 
         receipt.items.append(item)
-        receipt.updated_at = datetime.now(UTC)
+        receipt.updated_at = _now()
 
         await self.session.flush()
-        await self.session.refresh(receipt, ["items"])
 
         return receipt
 
@@ -817,124 +1220,112 @@ class ReceiptService:
             select(Receipt)
             .where(Receipt.id == receipt_id, col(Receipt.user_id) == user_id)
             .with_for_update()
+            .options(_WITH_ITEMS)
+            .execution_options(populate_existing=True)
         )
         receipt = await self.session.scalar(stmt)
         if not receipt:
             raise NotFoundError(f"Receipt with id {receipt_id} not found")
-        await self.session.refresh(receipt, ["items"])
 
         # Find the item in the receipt
-        item = next((i for i in receipt.items if i.id == item_id), None)
+        items_by_id = {i.id: i for i in receipt.items if i.id is not None}
+        item = items_by_id.get(item_id)
         if not item:
             raise NotFoundError(
                 f"Item with id {item_id} not found in receipt {receipt_id}"
             )
 
-        if item in receipt.items:
-            receipt.items.remove(item)
+        # The item was looked up from this collection, so it is always present
+        receipt.items.remove(item)
 
         # Delete the item
         await self.session.delete(item)
         await self.session.flush()
-        await self.session.refresh(receipt, ["items"])
 
-        receipt.updated_at = datetime.now(UTC)
+        receipt.updated_at = _now()
 
         return receipt
 
     async def export_to_csv(
         self, *, filters: ReceiptFilters | None = None, user_id: int
-    ) -> str:
+    ) -> AsyncIterator[bytes]:
         """Export receipts to CSV format.
 
         Args:
             filters: Optional dictionary of filter parameters (same as list method)
             user_id: The ID of the user whose receipts to export
 
-        Returns:
-            CSV content as a string with RFC 4180 compliance
+        Yields:
+            UTF-8 encoded CSV chunks (RFC 4180): the header, then one chunk per
+            batch of receipts, so the export never sits in memory as a single string
 
         Note:
             The CSV format flattens receipt data: one row per item.
             Receipts without items will have one row with empty item fields.
         """
-        # Get filtered receipts using existing list method
-        # Note: No limit applied to ensure complete export of all matching receipts
-        receipts = await self.list(filters=filters, user_id=user_id, skip=0, limit=None)
-
-        # Define CSV columns
-        fieldnames = [
-            "receipt_id",
-            "receipt_date",
-            "store_name",
-            "receipt_total",
-            "receipt_currency",
-            "payment_method",
-            "tax_amount",
-            "item_id",
-            "item_name",
-            "item_quantity",
-            "item_unit_price",
-            "item_total_price",
-            "item_currency",
-            "category_name",
-        ]
-
-        # Use StringIO for in-memory CSV generation
+        # Small scratch buffer, drained after the header and after each batch
         output = StringIO()
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
-
-        # Write data rows
-        for receipt in receipts:
-            # Build base row with common receipt fields
-            base_row = {
-                "receipt_id": receipt.id,
-                "receipt_date": receipt.purchase_date.isoformat(),
-                "store_name": receipt.store_name,
-                "receipt_total": str(receipt.total_amount),
-                "receipt_currency": receipt.currency,
-                "payment_method": receipt.payment_method.value
-                if receipt.payment_method
-                else "",
-                "tax_amount": str(receipt.tax_amount)
-                if receipt.tax_amount is not None
-                else "",
-            }
-
-            # Handle receipts with no items
-            if not receipt.items:
-                writer.writerow(
-                    {
-                        **base_row,
-                        "item_id": "",
-                        "item_name": "",
-                        "item_quantity": "",
-                        "item_unit_price": "",
-                        "item_total_price": "",
-                        "item_currency": "",
-                        "category_name": "",
-                    }
-                )
-            else:
-                # One row per item, with receipt data repeated
-                for item in receipt.items:
-                    writer.writerow(
-                        {
-                            **base_row,
-                            "item_id": item.id,
-                            "item_name": item.name,
-                            "item_quantity": item.quantity,
-                            "item_unit_price": str(item.unit_price),
-                            "item_total_price": str(item.total_price),
-                            "item_currency": item.currency,
-                            "category_name": item.category.name
-                            if item.category
-                            else "",
-                        }
-                    )
+        writer = csv.writer(output)
+        writer.writerow(_CSV_EXPORT_HEADER)
+        yield self._drain_csv_buffer(output)
+
+        # Stream flat rows straight from the joined query, skipping ORM object
+        # loading, and write each fetched batch with a single writerows call
+        stmt = _CSV_EXPORT_STMT.where(
+            col(Receipt.user_id) == user_id, *self._filter_clauses(filters)
+        )
+        result = await self.session.stream(
+            stmt.execution_options(yield_per=_EXPORT_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            writer.writerows(self._iter_csv_rows(rows))
+            yield self._drain_csv_buffer(output)
 
-        return output.getvalue()
+    @staticmethod
+    def _iter_csv_rows(
+        rows: Sequence[Row[*tuple[Any, ...]]],
+    ) -> Iterator[tuple[Any, ...]]:
+        """Yield CSV rows, in _CSV_EXPORT_HEADER order, for flat export query rows.
+
+        Only the date and payment method need formatting; Decimals are left for
+        the C writer to str(), and it writes the NULL item columns of item-less
+        receipts as "".
+        """
+        for row in rows:
+            yield (
+                row.receipt_id,
+                row.receipt_date.isoformat(),
+                row.store_name,
+                row.receipt_total,
+                row.receipt_currency,
+                row.payment_method.value if row.payment_method else "",
+                row.tax_amount,
+                row.item_id,
+                row.item_name,
+                row.item_quantity,
+                row.item_unit_price,
+                row.item_total_price,
+                row.item_currency,
+                row.category_name,
+            )
+
+    async def export_to_jsonl(
+        self, *, filters: ReceiptFilters | None = None, user_id: int
+    ) -> AsyncIterator[bytes]:
+        """Export receipts as JSON Lines.
+
+        Args:
+            filters: Optional dictionary of filter parameters (same as list method)
+            user_id: The ID of the user whose receipts to export
+
+        Yields:
+            One UTF-8 encoded ReceiptRead JSON object per receipt, newline-terminated
+        """
+        async for receipt in self._stream_receipts(filters=filters, user_id=user_id):
+            receipt_read = _RECEIPT_READ_ADAPTER.validate_python(
+                receipt, from_attributes=True
+            )
+            yield _RECEIPT_READ_ADAPTER.dump_json(receipt_read) + b"\n"
 
     async def export_to_pdf(
         self,
@@ -962,8 +1353,16 @@ class ReceiptService:
         # Note: No limit applied to ensure complete export of all matching receipts
         receipts = await self.list(filters=filters, user_id=user_id, skip=0, limit=None)
 
-        # Generate PDF using the PDF generator
-        generator = ReceiptPDFGenerator()
-        pdf_bytes = generator.generate(list(receipts), include_images=include_images)
+        # ReportLab is heavy to import; defer it until a PDF is actually requested
+        from app.receipt.exporters import pdf_generator_pool
 
-        return pdf_bytes
+        # Generate PDF with a pooled generator (reuses its built stylesheet).
+        # Rendering is CPU-bound, so it runs in a worker thread; the receipts'
+        # items and categories are already loaded, so no lazy loads happen there.
+        generator = pdf_generator_pool.acquire()
+        try:
+            return await asyncio.to_thread(
+                generator.generate, list(receipts), include_images=include_images
+            )
+        finally:
+            pdf_generator_pool.release(generator)
@@ -1,6 +1,7 @@
 """Tests for the receipt API endpoints."""
 
 import json
+import zipfile
 from decimal import Decimal
 from io import BytesIO
 from pathlib import Path
@@ -8,6 +9,8 @@ from pathlib import Path
 import pytest
 from fastapi.testclient import TestClient
 
+from app.auth.models import User
+from app.auth.utils import hash_password
 from app.category.models import Category
 from app.core.config import settings
 from app.receipt.models import Receipt, ReceiptItem
@@ -44,6 +47,39 @@ async def test_get_receipt(
     assert data["store_name"] == test_receipt.store_name
 
 
+@pytest.mark.asyncio
+async def test_get_receipt_returns_items_added_after_first_load(
+    test_client: TestClient,
+    test_session,
+    test_receipt: Receipt,
+    test_category: Category,
+    auth_headers: dict[str, str],
+) -> None:
+    """Test that a receipt already in the session is returned with fresh items."""
+    first = test_client.get(f"/api/v1/receipts/{test_receipt.id}", headers=auth_headers)
+    assert first.status_code == 200
+    assert first.json()["items"] == []
+
+    item = ReceiptItem(
+        name="Late Item",
+        quantity=1,
+        unit_price=Decimal("2.50"),
+        total_price=Decimal("2.50"),
+        currency="$",
+        receipt_id=test_receipt.id,
+        category_id=test_category.id,
+    )
+    test_session.add(item)
+    await test_session.commit()
+
+    response = test_client.get(
+        f"/api/v1/receipts/{test_receipt.id}", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert [i["name"] for i in response.json()["items"]] == ["Late Item"]
+
+
 @pytest.mark.asyncio
 async def test_update_receipt(
     test_client: TestClient, test_receipt: Receipt, auth_headers: dict[str, str]
@@ -66,6 +102,46 @@ async def test_update_receipt(
     assert float(data["total_amount"]) == update_data["total_amount"]
 
 
+@pytest.mark.asyncio
+async def test_update_receipt_with_items(
+    test_client: TestClient,
+    test_session,
+    test_receipt: Receipt,
+    test_receipt_item: ReceiptItem,
+    test_category: Category,
+    auth_headers: dict[str, str],
+) -> None:
+    """Test that updating a receipt returns its current items."""
+    # Load the receipt and its items into the session before they change
+    first = test_client.get(f"/api/v1/receipts/{test_receipt.id}", headers=auth_headers)
+    assert [i["id"] for i in first.json()["items"]] == [test_receipt_item.id]
+
+    extra_item = ReceiptItem(
+        name="Extra Item",
+        quantity=1,
+        unit_price=Decimal("1.25"),
+        total_price=Decimal("1.25"),
+        currency="$",
+        receipt_id=test_receipt.id,
+        category_id=test_category.id,
+    )
+    test_session.add(extra_item)
+    await test_session.commit()
+
+    response = test_client.patch(
+        f"/api/v1/receipts/{test_receipt.id}",
+        content=json.dumps({"store_name": "Updated Store"}),
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["store_name"] == "Updated Store"
+    assert sorted(i["id"] for i in data["items"]) == sorted(
+        [test_receipt_item.id, extra_item.id]
+    )
+
+
 @pytest.mark.asyncio
 async def test_get_nonexistent_receipt(
     test_client: TestClient, auth_headers: dict[str, str]
@@ -424,6 +500,25 @@ async def test_list_stores(
     assert test_receipt.store_name in data
 
 
+@pytest.mark.asyncio
+async def test_list_stores_revalidates_with_etag(
+    test_client: TestClient, test_receipt: Receipt, auth_headers: dict[str, str]
+) -> None:
+    """Test that the store list answers a matching ETag with 304."""
+    first = test_client.get("/api/v1/receipts/stores", headers=auth_headers)
+    etag = first.headers["etag"]
+
+    response = test_client.get(
+        "/api/v1/receipts/stores", headers={**auth_headers, "If-None-Match": etag}
+    )
+
+    assert first.status_code == 200
+    assert etag.startswith('W/"')
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+
 # Export Tests
 
 
@@ -456,6 +551,37 @@ async def test_export_receipts_basic(
     assert "category_name" in header
 
 
+@pytest.mark.asyncio
+async def test_export_receipts_gzip_encoding(
+    test_client: TestClient, test_receipt: Receipt, auth_headers: dict[str, str]
+) -> None:
+    """Test export is gzip-encoded only when the client accepts it."""
+    gzip_response = test_client.get(
+        "/api/v1/receipts/export",
+        headers={**auth_headers, "Accept-Encoding": "gzip"},
+    )
+    assert gzip_response.status_code == 200
+    assert gzip_response.headers["content-encoding"] == "gzip"
+    assert gzip_response.headers["vary"] == "Accept-Encoding"
+    assert gzip_response.text.startswith("receipt_id,")
+
+    plain_response = test_client.get(
+        "/api/v1/receipts/export",
+        headers={**auth_headers, "Accept-Encoding": "identity"},
+    )
+    assert plain_response.status_code == 200
+    assert "content-encoding" not in plain_response.headers
+    assert plain_response.text == gzip_response.text
+
+    # An explicit gzip refusal wins over a wildcard
+    refused_response = test_client.get(
+        "/api/v1/receipts/export",
+        headers={**auth_headers, "Accept-Encoding": "*, gzip;q=0"},
+    )
+    assert refused_response.status_code == 200
+    assert "content-encoding" not in refused_response.headers
+
+
 @pytest.mark.asyncio
 async def test_export_receipts_with_filters(
     test_client: TestClient, test_receipt: Receipt, auth_headers: dict[str, str]
@@ -606,6 +732,42 @@ async def test_get_receipt_image_returns_file(
     assert response.content == image_bytes
 
 
+@pytest.mark.asyncio
+async def test_get_receipt_image_not_modified(
+    test_client: TestClient,
+    test_session,
+    test_user,
+    auth_headers: dict[str, str],
+    test_uploads_dir: Path,
+    test_image: BytesIO,
+) -> None:
+    """Test that receipt image endpoint answers a matching ETag with 304."""
+    image_path = test_uploads_dir / "receipt_cached.png"
+    image_path.write_bytes(test_image.getvalue())
+
+    receipt = Receipt(
+        store_name="Image Store",
+        total_amount=Decimal("1.00"),
+        currency="$",
+        image_path=str(image_path),
+        user_id=test_user.id,
+    )
+    test_session.add(receipt)
+    await test_session.commit()
+    await test_session.refresh(receipt)
+
+    url = f"/api/v1/receipts/{receipt.id}/image"
+    first = test_client.get(url, headers=auth_headers)
+    etag = first.headers["etag"]
+
+    response = test_client.get(url, headers={**auth_headers, "If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+
 @pytest.mark.asyncio
 async def test_scan_receipt_rejects_large_upload(
     test_client: TestClient,
@@ -622,3 +784,74 @@ async def test_scan_receipt_rejects_large_upload(
 
     assert response.status_code == 400
     assert "File too large" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_download_receipt_images_batch(
+    test_client: TestClient,
+    test_session,
+    test_user,
+    auth_headers: dict[str, str],
+    test_uploads_dir: Path,
+    test_image: BytesIO,
+) -> None:
+    """Test that the batch download zips only the caller's stored images."""
+    other_user = User(
+        email="other@example.com",
+        hashed_password=hash_password("password123"),
+    )
+    test_session.add(other_user)
+    await test_session.commit()
+    await test_session.refresh(other_user)
+
+    receipts = []
+    for name, user in (
+        ("owned.PNG", test_user),
+        ("owned_gone.png", test_user),
+        ("foreign.png", other_user),
+    ):
+        image_path = test_uploads_dir / name
+        image_path.write_bytes(test_image.getvalue())
+        receipt = Receipt(
+            store_name="Image Store",
+            total_amount=Decimal("1.00"),
+            currency="$",
+            image_path=str(image_path),
+            user_id=user.id,
+        )
+        test_session.add(receipt)
+        receipts.append(receipt)
+    await test_session.commit()
+    owned, owned_gone, foreign = receipts
+    (test_uploads_dir / "owned_gone.png").unlink()
+
+    response = test_client.post(
+        "/api/v1/receipts/images/batch",
+        content=json.dumps(
+            {"receipt_ids": [owned.id, owned_gone.id, foreign.id, 999999]}
+        ),
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(BytesIO(response.content)) as archive:
+        assert archive.namelist() == [f"receipt_{owned.id}.png"]
+        assert archive.read(f"receipt_{owned.id}.png") == test_image.getvalue()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [0, 101])
+async def test_download_receipt_images_batch_rejects_out_of_bounds_ids(
+    test_client: TestClient,
+    auth_headers: dict[str, str],
+    count: int,
+) -> None:
+    """Test that batches must request between 1 and 100 receipts."""
+    response = test_client.post(
+        "/api/v1/receipts/images/batch",
+        content=json.dumps({"receipt_ids": list(range(1, count + 1))}),
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 422
@@ -239,6 +239,24 @@ async def test_get_user_by_id_not_found(
     assert "not found" in str(exc_info.value)
 
 
+@pytest.mark.asyncio
+async def test_get_user_active_status(
+    auth_service: AuthService, mock_session: AsyncMock
+) -> None:
+    """Test getting only a user's active flag."""
+    # Arrange
+    mock_session.scalar.side_effect = [True, None]
+
+    # Act
+    active = await auth_service.get_user_active_status(1)
+    missing = await auth_service.get_user_active_status(999)
+
+    # Assert
+    assert active is True
+    assert missing is None
+    assert mock_session.scalar.call_count == 2
+
+
 @pytest.mark.asyncio
 @patch("app.auth.services.hash_password")
 async def test_update_user_password(
@@ -143,6 +143,96 @@ async def test_list_categories(
     mock_session.exec.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_get_categories_by_names(
+    category_service: CategoryService, mock_session: AsyncMock
+) -> None:
+    """Test looking up several categories by name in one query."""
+    # Arrange
+    categories = [
+        Category(id=1, name="Groceries", description="Food"),
+        Category(id=2, name="Household", description="Cleaning"),
+    ]
+    mock_session.exec = AsyncMock()
+    mock_session.exec.return_value = MagicMock()
+    mock_session.exec.return_value.all.return_value = categories
+
+    # Act
+    found = await category_service.get_by_names(
+        ["Groceries", "Household", "Groceries", "Pets"], user_id=TEST_USER_ID
+    )
+
+    # Assert
+    assert found == {"Groceries": categories[0], "Household": categories[1]}
+    mock_session.exec.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_categories_by_names_empty(
+    category_service: CategoryService, mock_session: AsyncMock
+) -> None:
+    """Test that an empty name list skips the query."""
+    mock_session.exec = AsyncMock()
+
+    found = await category_service.get_by_names([], user_id=TEST_USER_ID)
+
+    assert found == {}
+    mock_session.exec.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_by_names_skips_insert_when_all_exist(
+    category_service: CategoryService, mock_session: AsyncMock
+) -> None:
+    """Test that existing categories are returned without an insert."""
+    # Arrange
+    groceries = Category(id=1, name="Groceries", description="Food")
+    mock_session.exec = AsyncMock()
+    mock_session.exec.return_value = MagicMock()
+    mock_session.exec.return_value.all.return_value = [groceries]
+    mock_session.scalars = AsyncMock()
+
+    # Act
+    found = await category_service.get_or_create_by_names(
+        [CategoryCreate(name="Groceries"), CategoryCreate(name="Groceries")],
+        user_id=TEST_USER_ID,
+    )
+
+    # Assert
+    assert found == {"Groceries": groceries}
+    mock_session.scalars.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_by_names_inserts_missing(
+    category_service: CategoryService, mock_session: AsyncMock
+) -> None:
+    """Test that missing categories are created with a single insert."""
+    # Arrange
+    groceries = Category(id=1, name="Groceries", description="Food")
+    pets = Category(id=2, name="Pets", description="Pet food")
+    mock_session.exec = AsyncMock()
+    mock_session.exec.return_value = MagicMock()
+    mock_session.exec.return_value.all.return_value = [groceries]
+    mock_session.scalars = AsyncMock()
+    mock_session.scalars.return_value = MagicMock()
+    mock_session.scalars.return_value.all.return_value = [pets]
+
+    # Act
+    found = await category_service.get_or_create_by_names(
+        [
+            CategoryCreate(name="Groceries"),
+            CategoryCreate(name="Pets", description="Pet food"),
+        ],
+        user_id=TEST_USER_ID,
+    )
+
+    # Assert
+    assert found == {"Groceries": groceries, "Pets": pets}
+    mock_session.exec.assert_called_once()
+    mock_session.scalars.assert_called_once()
+
+
 @pytest.mark.asyncio
 async def test_update_category(
     category_service: CategoryService, mock_session: AsyncMock
@@ -1,6 +1,7 @@
 """Unit tests for receipt CSV export functionality."""
 
 import csv
+from collections import namedtuple
 from datetime import UTC, datetime
 from decimal import Decimal
 from io import StringIO
@@ -10,7 +11,11 @@ import pytest
 
 from app.category.services import CategoryService
 from app.receipt.models import PaymentMethod
-from app.receipt.services import ReceiptService
+from app.receipt.services import (
+    _CSV_EXPORT_HEADER,
+    _CSV_EXPORT_STMT,
+    ReceiptService,
+)
 
 # Test user ID for data isolation
 TEST_USER_ID = 1
@@ -43,6 +48,54 @@ def receipt_service(
     )
 
 
+# Stand-in for the export query's rows, which expose columns by label
+ExportRow = namedtuple("ExportRow", _CSV_EXPORT_HEADER)
+
+
+async def collect_csv(service: ReceiptService, **kwargs: object) -> str:
+    """Drain the streamed CSV export into a single string."""
+    chunks = [chunk async for chunk in service.export_to_csv(**kwargs)]
+    return b"".join(chunks).decode("utf-8")
+
+
+def mock_streamed_receipts(mock_session: AsyncMock, receipts: list[MagicMock]) -> None:
+    """Make the session stream the given receipts to the export as flat rows."""
+    rows: list[tuple[object, ...]] = []
+    for receipt in receipts:
+        receipt_columns = (
+            receipt.id,
+            receipt.purchase_date,
+            receipt.store_name,
+            receipt.total_amount,
+            receipt.currency,
+            receipt.payment_method,
+            receipt.tax_amount,
+        )
+        # Item-less receipts come back from the outer join with NULL item columns
+        rows.extend(
+            receipt_columns
+            + (
+                item.id,
+                item.name,
+                item.quantity,
+                item.unit_price,
+                item.total_price,
+                item.currency,
+                item.category.name if item.category else None,
+            )
+            for item in receipt.items
+        )
+        if not receipt.items:
+            rows.append(receipt_columns + (None,) * 7)
+
+    named_rows = [ExportRow(*row) for row in rows]
+    result = MagicMock()
+    result.partitions.return_value.__aiter__.return_value = (
+        [named_rows] if named_rows else []
+    )
+    mock_session.stream = AsyncMock(return_value=result)
+
+
 def create_mock_category(category_id: int = 1, name: str = "Groceries") -> MagicMock:
     """Create a mock category object."""
     category = MagicMock()
@@ -124,12 +177,10 @@ async def test_export_csv_with_items(
         [item1, item2],
     )
 
-    mock_session.exec = AsyncMock()
-    mock_session.exec.return_value = MagicMock()
-    mock_session.exec.return_value.all.return_value = [receipt]
+    mock_streamed_receipts(mock_session, [receipt])
 
     # Act
-    csv_content = await receipt_service.export_to_csv(user_id=TEST_USER_ID)
+    csv_content = await collect_csv(receipt_service, user_id=TEST_USER_ID)
 
     # Assert - Parse CSV to verify content
     csv_reader = csv.DictReader(StringIO(csv_content))
@@ -180,12 +231,10 @@ async def test_export_csv_without_items(
         [],
     )
 
-    mock_session.exec = AsyncMock()
-    mock_session.exec.return_value = MagicMock()
-    mock_session.exec.return_value.all.return_value = [receipt]
+    mock_streamed_receipts(mock_session, [receipt])
 
     # Act
-    csv_content = await receipt_service.export_to_csv(user_id=TEST_USER_ID)
+    csv_content = await collect_csv(receipt_service, user_id=TEST_USER_ID)
 
     # Assert - Parse CSV to verify content
     csv_reader = csv.DictReader(StringIO(csv_content))
@@ -247,12 +296,10 @@ async def test_export_csv_multiple_receipts(
         [],
     )
 
-    mock_session.exec = AsyncMock()
-    mock_session.exec.return_value = MagicMock()
-    mock_session.exec.return_value.all.return_value = [receipt1, receipt2]
+    mock_streamed_receipts(mock_session, [receipt1, receipt2])
 
     # Act
-    csv_content = await receipt_service.export_to_csv(user_id=TEST_USER_ID)
+    csv_content = await collect_csv(receipt_service, user_id=TEST_USER_ID)
 
     # Assert - Parse CSV to verify content
     csv_reader = csv.DictReader(StringIO(csv_content))
@@ -276,12 +323,10 @@ async def test_export_csv_headers(
 ) -> None:
     """Test that CSV has correct headers."""
     # Arrange
-    mock_session.exec = AsyncMock()
-    mock_session.exec.return_value = MagicMock()
-    mock_session.exec.return_value.all.return_value = []
+    mock_streamed_receipts(mock_session, [])
 
     # Act
-    csv_content = await receipt_service.export_to_csv(user_id=TEST_USER_ID)
+    csv_content = await collect_csv(receipt_service, user_id=TEST_USER_ID)
 
     # Assert - Check headers
     csv_reader = csv.DictReader(StringIO(csv_content))
@@ -311,12 +356,10 @@ async def test_export_csv_empty_results(
 ) -> None:
     """Test CSV export with no receipts."""
     # Arrange
-    mock_session.exec = AsyncMock()
-    mock_session.exec.return_value = MagicMock()
-    mock_session.exec.return_value.all.return_value = []
+    mock_streamed_receipts(mock_session, [])
 
     # Act
-    csv_content = await receipt_service.export_to_csv(user_id=TEST_USER_ID)
+    csv_content = await collect_csv(receipt_service, user_id=TEST_USER_ID)
 
     # Assert - Should have headers but no data rows
     csv_reader = csv.DictReader(StringIO(csv_content))
@@ -353,9 +396,7 @@ async def test_export_csv_with_filters(
         [item1, item2],
     )
 
-    mock_session.exec = AsyncMock()
-    mock_session.exec.return_value = MagicMock()
-    mock_session.exec.return_value.all.return_value = [receipt]
+    mock_streamed_receipts(mock_session, [receipt])
 
     filters = {
         "store": "Test Store",
@@ -364,8 +405,8 @@ async def test_export_csv_with_filters(
     }
 
     # Act
-    csv_content = await receipt_service.export_to_csv(
-        filters=filters, user_id=TEST_USER_ID
+    csv_content = await collect_csv(
+        receipt_service, filters=filters, user_id=TEST_USER_ID
     )
 
     # Assert - Verify CSV is generated
@@ -397,12 +438,10 @@ async def test_export_csv_item_without_category(
         [item],
     )
 
-    mock_session.exec = AsyncMock()
-    mock_session.exec.return_value = MagicMock()
-    mock_session.exec.return_value.all.return_value = [receipt]
+    mock_streamed_receipts(mock_session, [receipt])
 
     # Act
-    csv_content = await receipt_service.export_to_csv(user_id=TEST_USER_ID)
+    csv_content = await collect_csv(receipt_service, user_id=TEST_USER_ID)
 
     # Assert - Category name should be empty
     csv_reader = csv.DictReader(StringIO(csv_content))
@@ -446,12 +485,10 @@ async def test_export_csv_payment_methods(
         )
         receipts.append(receipt)
 
-    mock_session.exec = AsyncMock()
-    mock_session.exec.return_value = MagicMock()
-    mock_session.exec.return_value.all.return_value = receipts
+    mock_streamed_receipts(mock_session, receipts)
 
     # Act
-    csv_content = await receipt_service.export_to_csv(user_id=TEST_USER_ID)
+    csv_content = await collect_csv(receipt_service, user_id=TEST_USER_ID)
 
     # Assert - Check payment methods are included
     csv_reader = csv.DictReader(StringIO(csv_content))
@@ -486,12 +523,10 @@ async def test_export_csv_rfc4180_compliance(
         [item],
     )
 
-    mock_session.exec = AsyncMock()
-    mock_session.exec.return_value = MagicMock()
-    mock_session.exec.return_value.all.return_value = [receipt]
+    mock_streamed_receipts(mock_session, [receipt])
 
     # Act
-    csv_content = await receipt_service.export_to_csv(user_id=TEST_USER_ID)
+    csv_content = await collect_csv(receipt_service, user_id=TEST_USER_ID)
 
     # Assert - Verify CSV can be parsed correctly despite special characters
     csv_reader = csv.DictReader(StringIO(csv_content))
@@ -525,12 +560,10 @@ async def test_export_csv_decimal_precision(
         [item],
     )
 
-    mock_session.exec = AsyncMock()
-    mock_session.exec.return_value = MagicMock()
-    mock_session.exec.return_value.all.return_value = [receipt]
+    mock_streamed_receipts(mock_session, [receipt])
 
     # Act
-    csv_content = await receipt_service.export_to_csv(user_id=TEST_USER_ID)
+    csv_content = await collect_csv(receipt_service, user_id=TEST_USER_ID)
 
     # Assert - Check decimal values are preserved
     csv_reader = csv.DictReader(StringIO(csv_content))
@@ -541,3 +574,8 @@ async def test_export_csv_decimal_precision(
     assert rows[0]["item_unit_price"] == "3.33"
     assert rows[0]["item_total_price"] == "9.99"
     assert rows[0]["item_quantity"] == "3"
+
+
+def test_export_query_columns_match_csv_header() -> None:
+    """The export query's column labels line up with the CSV header."""
+    assert tuple(_CSV_EXPORT_STMT.selected_columns.keys()) == _CSV_EXPORT_HEADER
@@ -2,13 +2,18 @@
 
 from datetime import datetime
 from decimal import Decimal
-from io import BytesIO
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 from PIL import Image as PILImage
 
-from app.receipt.exporters import ReceiptPDFGenerator
+from app.receipt.exporters import (
+    ReceiptPDFGenerator,
+    _ChunkSink,
+    _GeneratorPool,
+    _prefetch_image_sizes,
+)
 from app.receipt.models import PaymentMethod
 
 
@@ -94,7 +99,7 @@ def pdf_generator() -> ReceiptPDFGenerator:
 
 def test_pdf_generator_init(pdf_generator: ReceiptPDFGenerator) -> None:
     """Test PDF generator initialization."""
-    assert isinstance(pdf_generator.buffer, BytesIO)
+    assert not hasattr(pdf_generator, "buffer")
     assert pdf_generator.styles is not None
     assert "ReportTitle" in pdf_generator.styles
     assert "SectionTitle" in pdf_generator.styles
@@ -408,11 +413,90 @@ def test_create_receipt_section_image_scaling(
 
 
 def test_buffer_closed_after_generate(sample_receipt: MagicMock) -> None:
-    """Test that buffer is closed after generating PDF."""
+    """Test that each generate call renders into its own sink and closes it."""
+    sinks: list[_ChunkSink] = []
+
+    class RecordingSink(_ChunkSink):
+        def __init__(self) -> None:
+            super().__init__()
+            sinks.append(self)
+
     generator = ReceiptPDFGenerator()
     receipts = [sample_receipt]
 
-    pdf_bytes = generator.generate(receipts, include_images=False)
+    with patch("app.receipt.exporters._ChunkSink", RecordingSink):
+        pdf_bytes = generator.generate(receipts, include_images=False)
+        generator.generate(receipts, include_images=False)
 
     assert isinstance(pdf_bytes, bytes)
-    assert generator.buffer.closed
+    assert pdf_bytes.startswith(b"%PDF")
+    assert len(sinks) == 2
+    assert sinks[0] is not sinks[1]
+    assert all(sink.closed for sink in sinks)
+
+
+def test_generator_pool_reuses_released_generator(sample_receipt: MagicMock) -> None:
+    """Test that a released generator is handed out again and still renders."""
+    pool = _GeneratorPool(size=1)
+    generator = pool.acquire()
+    generator.generate([sample_receipt])
+    pool.release(generator)
+
+    reused = pool.acquire()
+
+    assert reused is generator
+    assert isinstance(reused.generate([sample_receipt]), bytes)
+
+
+def test_create_receipt_section_escapes_markup_in_store_name(
+    pdf_generator: ReceiptPDFGenerator,
+) -> None:
+    """Test that markup characters in store names don't break the PDF."""
+    receipt = create_mock_receipt(store_name="Marks & Spencer <Express>", items=[])
+
+    pdf_bytes = pdf_generator.generate([receipt])
+
+    assert pdf_bytes.startswith(b"%PDF")
+
+
+def test_create_image_section_caches_dimensions(
+    pdf_generator: ReceiptPDFGenerator, tmp_path: Path
+) -> None:
+    """Test that repeated exports of the same image only decode its header once."""
+    image_path = tmp_path / "receipt.png"
+    PILImage.new("RGB", (40, 80), "white").save(image_path)
+
+    with patch("app.receipt.exporters.PILImage.open", wraps=PILImage.open) as mock_open:
+        first = pdf_generator._create_image_section(str(image_path))
+        second = pdf_generator._create_image_section(str(image_path))
+
+    assert first
+    assert second
+    assert mock_open.call_count == 1
+
+
+def test_prefetch_image_sizes_warms_cache(
+    pdf_generator: ReceiptPDFGenerator, tmp_path: Path
+) -> None:
+    """Test that prefetched image headers are not re-read during layout."""
+    image_paths = []
+    for index in range(3):
+        image_path = tmp_path / f"receipt-{index}.png"
+        PILImage.new("RGB", (40 + index, 80), "white").save(image_path)
+        image_paths.append(str(image_path))
+    # Stored paths need not be normalized; the cache key must still match
+    receipts = [
+        create_mock_receipt(receipt_id=i, image_path=f"{tmp_path}/./receipt-{i}.png")
+        for i in range(len(image_paths))
+    ]
+    receipts.append(
+        create_mock_receipt(receipt_id=9, image_path=str(tmp_path / "missing.png"))
+    )
+
+    _prefetch_image_sizes(receipts)
+
+    with patch("app.receipt.exporters.PILImage.open") as mock_open:
+        sections = [pdf_generator._create_image_section(p) for p in image_paths]
+
+    assert all(sections)
+    mock_open.assert_not_called()
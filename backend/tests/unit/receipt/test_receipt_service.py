@@ -1,13 +1,15 @@
 """Unit tests for the receipt domain."""
 
+import json
 from decimal import Decimal
+from io import BytesIO
 from pathlib import Path
 from types import SimpleNamespace
 from typing import cast
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 
 from app.auth.models import User  # noqa: F401
 from app.category.services import CategoryService
@@ -127,7 +129,8 @@ async def test_get_receipt(
     assert retrieved_receipt.store_name == receipt.store_name
     assert retrieved_receipt.total_amount == receipt.total_amount
     mock_session.scalar.assert_called_once()
-    mock_session.refresh.assert_called_once_with(receipt, ["items"])
+    # Items are eager-loaded by the query, so no refresh is needed
+    mock_session.refresh.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -195,18 +198,20 @@ async def test_update_receipt(
     )
     assert existing_receipt.id is not None
 
-    # Mock the scalar method for get
-    mock_session.scalar.return_value = existing_receipt
-
-    # Mock the flush and refresh methods
-    mock_session.flush = AsyncMock()
-    mock_session.refresh = AsyncMock()
-
     update_data = ReceiptUpdate(
         store_name="New Store",
         total_amount=Decimal("20.99"),
     )
 
+    # Mock the scalar method for UPDATE ... RETURNING
+    mock_session.scalar.return_value = existing_receipt.model_copy(
+        update=update_data.model_dump(exclude_unset=True)
+    )
+
+    # Mock the flush and refresh methods
+    mock_session.flush = AsyncMock()
+    mock_session.refresh = AsyncMock()
+
     # Act
     updated_receipt = await receipt_service.update(
         existing_receipt.id, update_data, user_id=TEST_USER_ID
@@ -216,9 +221,16 @@ async def test_update_receipt(
     assert updated_receipt.store_name == update_data.store_name
     assert updated_receipt.total_amount == update_data.total_amount
     assert updated_receipt.id == existing_receipt.id
+    # The row is updated and returned by a single statement scoped to the user
     mock_session.scalar.assert_called_once()
-    mock_session.flush.assert_called_once()
-    assert mock_session.refresh.call_count == 2  # Called once in get and once in update
+    stmt = mock_session.scalar.call_args.args[0]
+    compiled = stmt.compile()
+    assert str(compiled).startswith("UPDATE receipt SET")
+    assert "RETURNING" in str(compiled)
+    assert compiled.params["store_name"] == "New Store"
+    assert compiled.params["user_id_1"] == TEST_USER_ID
+    mock_session.flush.assert_not_called()
+    mock_session.refresh.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -352,6 +364,8 @@ async def test_update_receipt_item(
     # Assert
     assert updated_receipt.items[0].name == "Updated Item"
     assert updated_receipt.items[0].category_id == 2
+    # Item and receipt share one update timestamp
+    assert updated_receipt.items[0].updated_at == updated_receipt.updated_at
     mock_session.flush.assert_called_once()
 
 
@@ -452,13 +466,6 @@ async def test_update_receipt_with_metadata(
     )
     assert existing_receipt.id is not None
 
-    # Mock the scalar method for get
-    mock_session.scalar.return_value = existing_receipt
-
-    # Mock the flush and refresh methods
-    mock_session.flush = AsyncMock()
-    mock_session.refresh = AsyncMock()
-
     update_data = ReceiptUpdate(
         notes="Weekly grocery shopping",
         tags=["groceries", "weekly"],
@@ -466,6 +473,15 @@ async def test_update_receipt_with_metadata(
         tax_amount=Decimal("8.50"),
     )
 
+    # Mock the scalar method for UPDATE ... RETURNING
+    mock_session.scalar.return_value = existing_receipt.model_copy(
+        update=update_data.model_dump(exclude_unset=True)
+    )
+
+    # Mock the flush and refresh methods
+    mock_session.flush = AsyncMock()
+    mock_session.refresh = AsyncMock()
+
     # Act
     updated_receipt = await receipt_service.update(
         existing_receipt.id, update_data, user_id=TEST_USER_ID
@@ -476,7 +492,11 @@ async def test_update_receipt_with_metadata(
     assert updated_receipt.tags == ["groceries", "weekly"]
     assert updated_receipt.payment_method == PaymentMethod.CREDIT_CARD
     assert updated_receipt.tax_amount == Decimal("8.50")
-    mock_session.flush.assert_called_once()
+    params = mock_session.scalar.call_args.args[0].compile().params
+    assert params["notes"] == "Weekly grocery shopping"
+    assert params["tags"] == ["groceries", "weekly"]
+    assert params["payment_method"] == PaymentMethod.CREDIT_CARD
+    assert params["tax_amount"] == Decimal("8.50")
 
 
 def test_receipt_with_metadata_fields():
@@ -769,6 +789,81 @@ async def test_list_receipts_with_amount_filters(
     mock_session.exec.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_get_image_paths_skips_missing_images(
+    receipt_service: ReceiptService,
+    mock_session: AsyncMock,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Test batch image lookup resolves found images and skips missing ones."""
+    # Arrange
+    existing = tmp_path / "receipt.png"
+    existing.write_bytes(b"image")
+
+    def resolve(image_path: str) -> Path:
+        if image_path == "receipt.png":
+            return existing
+        raise NotFoundError("Receipt image not found")
+
+    mock_exec_result = MagicMock()
+    mock_exec_result.all.return_value = [(1, "receipt.png"), (2, "missing.png")]
+    mock_session.exec = AsyncMock(return_value=mock_exec_result)
+    monkeypatch.setattr(receipt_service, "resolve_image_path", resolve)
+
+    # Act
+    result = await receipt_service.get_image_paths([1, 2], user_id=TEST_USER_ID)
+
+    # Assert
+    assert result == [(1, existing)]
+    mock_session.exec.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_export_to_jsonl_yields_one_receipt_per_line(
+    receipt_service: ReceiptService, mock_session: AsyncMock
+) -> None:
+    """Test JSON Lines export streams each receipt with its items."""
+    # Arrange
+    receipts = [
+        Receipt(
+            id=i,
+            store_name=f"Store {i}",
+            total_amount=Decimal("5.00"),
+            currency="$",
+            image_path=f"/path/{i}.jpg",
+            user_id=TEST_USER_ID,
+            items=[
+                ReceiptItem(
+                    id=i,
+                    name="Milk",
+                    quantity=1,
+                    unit_price=Decimal("5.00"),
+                    total_price=Decimal("5.00"),
+                    currency="$",
+                    receipt_id=i,
+                )
+            ],
+        )
+        for i in range(1, 3)
+    ]
+    mock_stream_result = MagicMock()
+    mock_stream_result.__aiter__.return_value = receipts
+    mock_session.stream_scalars = AsyncMock(return_value=mock_stream_result)
+
+    # Act
+    chunks = [
+        chunk async for chunk in receipt_service.export_to_jsonl(user_id=TEST_USER_ID)
+    ]
+
+    # Assert
+    lines = [json.loads(chunk) for chunk in chunks]
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert [line["store_name"] for line in lines] == ["Store 1", "Store 2"]
+    assert lines[0]["items"][0]["name"] == "Milk"
+    assert lines[0]["total_amount"] == "5.00"
+
+
 @pytest.mark.asyncio
 async def test_list_receipts_with_no_filters(
     receipt_service: ReceiptService, mock_session: AsyncMock
@@ -882,6 +977,116 @@ def test_dedupe_scanned_items_by_total_keeps_unique_lines(
     assert note is None
 
 
+def test_dedupe_scanned_items_by_total_skips_search_without_duplicates(
+    receipt_service: ReceiptService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The subset search is skipped when no two lines share a signature."""
+    items = cast(
+        list[ReceiptItem],
+        [
+            SimpleNamespace(name="A", total_price=Decimal("5.00"), currency="GBP"),
+            SimpleNamespace(name="B", total_price=Decimal("4.00"), currency="GBP"),
+            SimpleNamespace(name="C", total_price=Decimal("4.00"), currency="GBP"),
+        ],
+    )
+    search = MagicMock()
+    monkeypatch.setattr(receipt_service, "_find_subset_indices_matching_total", search)
+
+    filtered, removed, note = receipt_service._dedupe_scanned_items_by_total(
+        items, Decimal("5.00")
+    )
+
+    assert filtered == items
+    assert removed == []
+    assert note is None
+    search.assert_not_called()
+
+
+def test_copy_upload_to_disk_returns_written_size(tmp_path: Path) -> None:
+    """Uploads are copied to disk and their on-disk size is reported."""
+    payload = b"x" * (3 * 1024 * 1024 + 17)
+    destination = tmp_path / "receipt.jpg"
+
+    written = ReceiptService._copy_upload_to_disk(BytesIO(payload), destination)
+
+    assert written == len(payload)
+    assert destination.read_bytes() == payload
+
+
+def test_to_money_quantizes_floats_to_cents() -> None:
+    """Float amounts from the AI become two-place Decimals."""
+    assert ReceiptService._to_money(19.99) == Decimal("19.99")
+    assert ReceiptService._to_money(10 / 3) == Decimal("3.33")
+    assert ReceiptService._to_money(2.5) == Decimal("2.50")
+    assert str(ReceiptService._to_money(4.0)) == "4.00"
+
+
+def test_load_image_rejects_corrupt_files(tmp_path: Path) -> None:
+    """Only files that decode completely are returned as images."""
+    valid_path = tmp_path / "receipt.png"
+    Image.new("RGB", (64, 64), "white").save(valid_path)
+    corrupt_path = tmp_path / "corrupt.png"
+    corrupt_path.write_bytes(b"not an image")
+    truncated_path = tmp_path / "truncated.jpg"
+    buffer = BytesIO()
+    Image.effect_noise((64, 64), 64).convert("RGB").save(buffer, format="JPEG")
+    truncated_path.write_bytes(buffer.getvalue()[: len(buffer.getvalue()) // 2])
+
+    with ReceiptService._load_image(valid_path) as image:
+        assert image.size == (64, 64)
+    with pytest.raises(UnidentifiedImageError):
+        ReceiptService._load_image(corrupt_path)
+    with pytest.raises(OSError):
+        ReceiptService._load_image(truncated_path)
+
+
+def test_is_supported_image_checks_signatures() -> None:
+    """Formats Pillow decodes for scans pass the magic-byte check; others fail."""
+    for image_format in ("JPEG", "PNG", "WEBP", "GIF", "BMP", "TIFF"):
+        buffer = BytesIO()
+        Image.new("RGB", (8, 8), "white").save(buffer, format=image_format)
+        assert ReceiptService._is_supported_image(buffer.getvalue()[:12])
+
+    assert not ReceiptService._is_supported_image(b"not an image")
+    assert not ReceiptService._is_supported_image(b"%PDF-1.7\n%\xe2\xe3")
+    assert not ReceiptService._is_supported_image(b"")
+
+
+def test_store_as_jpeg_reencodes_non_jpeg_uploads(tmp_path: Path) -> None:
+    """PNG uploads are rewritten as JPEGs; small JPEG uploads are kept as is."""
+    png_path = tmp_path / "receipt.png"
+    Image.new("RGBA", (64, 48), "white").save(png_path)
+    transparent_path = tmp_path / "screenshot.png"
+    Image.new("RGBA", (64, 48), (0, 0, 0, 0)).save(transparent_path)
+    jpeg_path = tmp_path / "photo.jpeg"
+    Image.new("RGB", (64, 48), "white").save(jpeg_path, format="JPEG")
+
+    stored_path = ReceiptService._store_as_jpeg(png_path)
+
+    assert stored_path == tmp_path / "receipt.jpg"
+    assert not png_path.exists()
+    with Image.open(stored_path) as image:
+        assert image.format == "JPEG"
+        assert image.size == (64, 48)
+    assert ReceiptService._store_as_jpeg(jpeg_path) == jpeg_path
+
+    # Fully transparent pixels are flattened onto white, not black
+    with Image.open(ReceiptService._store_as_jpeg(transparent_path)) as image:
+        assert image.mode == "RGB"
+        assert all(channel >= 250 for channel in image.getpixel((32, 24)))
+
+
+def test_load_image_downsamples_large_photos(tmp_path: Path) -> None:
+    """Photos larger than the analysis limit are scaled down, keeping aspect."""
+    photo_path = tmp_path / "photo.jpg"
+    Image.new("RGB", (4000, 3000), "white").save(photo_path)
+
+    with ReceiptService._load_image(photo_path) as image:
+        assert image.size == (2048, 1536)
+    with Image.open(photo_path) as original:
+        assert original.size == (4000, 3000)
+
+
 @pytest.mark.asyncio
 async def test_reconcile_items_uses_deterministic_fallback_for_inconsistent_ai(
     receipt_service: ReceiptService,